@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency.
+AIMD (additive-increase, multiplicative-decrease) controller for the orchestrator's concurrency limit.
+"""
+
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class AIMDLimit:
+    """
+    Grow the limit by `increase / limit` per healthy completion (about +1 per
+    round of in-flight tasks) and multiply it by `decrease` on an error,
+    timeout or latency spike. At most one decrease per smoothed latency
+    interval, so one burst of failures from the same cohort counts once.
+    """
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5,
+                 latency_tolerance: float = 2.0, history_size: int = 1000):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self.value = float(max(min_limit, min(initial, max_limit)))
+        self.smoothed_latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.last_decrease = 0.0
+        self.started = time.monotonic()
+
+        self.increases = 0
+        self.decreases = 0
+        self.history = deque(maxlen=history_size)
+
+    @property
+    def limit(self) -> int:
+        return int(self.value)
+
+    def _adjust(self, value: float, reason: str):
+        before = self.limit
+        self.value = max(self.min_limit, min(self.max_limit, value))
+        if self.limit != before:
+            if self.limit > before:
+                self.increases += 1
+            else:
+                self.decreases += 1
+            self.history.append({
+                "at_seconds": round(time.monotonic() - self.started, 3),
+                "limit": self.limit,
+                "reason": reason,
+            })
+
+    def observe(self, latency: float, ok: bool):
+        """Feed one finished attempt into the controller."""
+        now = time.monotonic()
+        if ok:
+            self.smoothed_latency = (latency if self.smoothed_latency is None
+                                     else 0.8 * self.smoothed_latency + 0.2 * latency)
+            if self.baseline_latency is None or self.smoothed_latency < self.baseline_latency:
+                self.baseline_latency = self.smoothed_latency
+
+        congested = (ok and self.baseline_latency
+                     and self.smoothed_latency > self.baseline_latency * self.latency_tolerance)
+
+        if not ok or congested:
+            cooldown = self.smoothed_latency or 0.0
+            if now - self.last_decrease >= cooldown:
+                self.last_decrease = now
+                self._adjust(self.value * self.decrease, "error" if not ok else "latency")
+                if congested:
+                    # Re-learn the baseline at the new level instead of chasing a stale minimum
+                    self.baseline_latency = self.smoothed_latency
+        else:
+            self._adjust(self.value + self.increase / self.value, "increase")
+
+    def snapshot(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "min": self.min_limit,
+            "max": self.max_limit,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "smoothed_latency": round(self.smoothed_latency, 4) if self.smoothed_latency else None,
+            "adjustments": list(self.history),
+        }
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Scheduler Benchmark.
+Fixed scenarios that measure orchestrator overhead: throughput, dispatch latency and peak RSS.
+
+Each scenario runs in a fresh process so peak RSS belongs to that scenario alone.
+Throughput and RSS come from an untraced run; dispatch latency (slot acquired ->
+attempt start, i.e. scheduler overhead excluding time spent queued for a slot)
+from a traced run in a second process, so the tracer's memory isn't counted.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir))
+
+from orchestrator import Orchestrator, Task
+
+
+async def noop_async():
+    return None
+
+
+def noop_sync():
+    return None
+
+
+def build_noop_async(size: int) -> List[Task]:
+    return [Task(id=f"t{i}", name="noop", func=noop_async) for i in range(size)]
+
+
+def build_noop_sync(size: int) -> List[Task]:
+    return [Task(id=f"t{i}", name="noop", func=noop_sync) for i in range(size)]
+
+
+def build_chain(size: int) -> List[Task]:
+    return [Task(id=f"c{i}", name="link", func=noop_async,
+                 dependencies=[f"c{i - 1}"] if i else [])
+            for i in range(size)]
+
+
+def build_fan(size: int) -> List[Task]:
+    tasks = [Task(id="root", name="root", func=noop_async)]
+    tasks += [Task(id=f"f{i}", name="leaf", func=noop_async, dependencies=["root"])
+              for i in range(size)]
+    tasks.append(Task(id="sink", name="sink", func=noop_async,
+                      dependencies=[f"f{i}" for i in range(size)]))
+    return tasks
+
+
+def build_retries(size: int) -> List[Task]:
+    """Every fourth task fails its first attempt, every eighth its first two."""
+    attempts: Dict[int, int] = {}
+
+    def make(index: int) -> Callable:
+        failures = 2 if index % 8 == 0 else 1 if index % 4 == 0 else 0
+
+        async def flaky():
+            attempts[index] = attempts.get(index, 0) + 1
+            if attempts[index] <= failures:
+                raise RuntimeError("transient")
+        return flaky
+
+    return [Task(id=f"r{i}", name="flaky", func=make(i), retries=3) for i in range(size)]
+
+
+# name -> (builder, default size, orchestrator options)
+SCENARIOS = {
+    "noop_async": (build_noop_async, 10_000, {}),
+    "noop_sync": (build_noop_sync, 10_000, {}),
+    "chain": (build_chain, 1_000, {}),
+    "fan_out_in": (build_fan, 5_000, {}),
+    "retries": (build_retries, 2_000, {"retry_backoff": 0.001, "max_backoff": 0.01}),
+}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _run_once(name: str, size: int, max_concurrent: int, trace: bool) -> Orchestrator:
+    builder, _, options = SCENARIOS[name]
+    orchestrator = Orchestrator(max_concurrent=max_concurrent, trace=trace, **options)
+    orchestrator.add_tasks(builder(size))
+    await orchestrator.run()
+    return orchestrator
+
+
+def run_scenario(name: str, size: int, max_concurrent: int) -> Dict:
+    """Untraced run for throughput and peak RSS (meant to be called in its own process)."""
+    # Failed attempts print tracebacks; keep them out of the report (and the timings)
+    with contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        orchestrator = asyncio.run(_run_once(name, size, max_concurrent, trace=False))
+        elapsed = time.perf_counter() - start
+
+    summary = orchestrator.get_summary()
+    tasks = summary["total"]
+
+    return {
+        "scenario": name,
+        "tasks": tasks,
+        "max_concurrent": max_concurrent,
+        "seconds": round(elapsed, 4),
+        "tasks_per_sec": round(tasks / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "success": summary["success"],
+        "failed": summary["failed"],
+        "retries": summary["retries"],
+    }
+
+
+def measure_dispatch(name: str, size: int, max_concurrent: int) -> Dict:
+    """Traced run: slot acquired -> attempt start for every attempt (in its own process)."""
+    with contextlib.redirect_stderr(io.StringIO()):
+        traced = asyncio.run(_run_once(name, size, max_concurrent, trace=True))
+
+    latencies = [
+        attempt["start"] - attempt["slot"]
+        for trace in traced.tracer.traces.values()
+        for attempt in trace.attempts
+        if attempt["start"] is not None
+    ]
+    return {
+        "dispatch_p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "dispatch_p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def run_suite(scenarios: List[str], concurrency: List[int], scale: float = 1.0) -> List[Dict]:
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name in scenarios:
+        size = max(1, int(SCENARIOS[name][1] * scale))
+        for limit in concurrency:
+            result = {}
+            for measure in (run_scenario, measure_dispatch):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result.update(pool.submit(measure, name, size, limit).result())
+            results.append(result)
+            print(f"  {name:<12} c={limit:<5} {result['tasks_per_sec']:>10.1f} tasks/s  "
+                  f"p50 {result['dispatch_p50_ms']:.3f}ms  p99 {result['dispatch_p99_ms']:.3f}ms  "
+                  f"rss {result['peak_rss_mb']:.1f}MB")
+    return results
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """List throughput regressions larger than `tolerance` against a saved run."""
+    previous = {(r["scenario"], r["max_concurrent"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scenario"], result["max_concurrent"]))
+        if not before or not before["tasks_per_sec"]:
+            continue
+        change = result["tasks_per_sec"] / before["tasks_per_sec"] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{result['scenario']} (c={result['max_concurrent']}): "
+                f"{before['tasks_per_sec']:.1f} -> {result['tasks_per_sec']:.1f} tasks/s "
+                f"({change:+.1%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Orchestrator Scheduler Benchmark')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS),
+                        default=list(SCENARIOS), help='Scenarios to run')
+    parser.add_argument('--max-concurrent', '-c', type=int, nargs='+', default=[100],
+                        help='One or more concurrency limits to sweep')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply scenario sizes (e.g. 0.1 for a quick run)')
+    parser.add_argument('--output', '-o', help='Save results as JSON')
+    parser.add_argument('--baseline', '-b', help='Compare against a saved results JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed throughput drop vs baseline (fraction)')
+
+    args = parser.parse_args()
+
+    print("Running scheduler benchmark...")
+    results = run_suite(args.scenarios, args.max_concurrent, args.scale)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"results": results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", [])
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
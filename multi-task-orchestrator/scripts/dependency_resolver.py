@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Dependency Resolver.
+O(V+E) validation of task graphs: topological order, cycles (with their path),
+unknown dependencies and tasks that can never start.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+MAX_REPORTED_CYCLES = 20
+
+
+class GraphError(ValueError):
+    """The task graph can't be run as given."""
+
+    def __init__(self, message: str, report: Optional["GraphReport"] = None):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass
+class GraphReport:
+    order: List[str] = field(default_factory=list)  # Runnable tasks, dependencies first
+    cycles: List[List[str]] = field(default_factory=list)  # task -> its dependency -> ... -> task
+    unknown: Dict[str, List[str]] = field(default_factory=dict)  # task -> missing dependency ids
+    unreachable: List[str] = field(default_factory=list)  # Blocked behind a cycle or unknown dependency
+
+    @property
+    def ok(self) -> bool:
+        return not (self.cycles or self.unknown or self.unreachable)
+
+    def describe(self, limit: int = 10) -> str:
+        lines = []
+        for path in self.cycles[:limit]:
+            lines.append("Dependency cycle (task -> dependency): " + " -> ".join(path))
+        for task_id, missing in list(self.unknown.items())[:limit]:
+            lines.append(f"Unknown dependency for task {task_id}: {', '.join(missing)}")
+        if self.unreachable:
+            shown = ", ".join(self.unreachable[:limit])
+            more = f" (+{len(self.unreachable) - limit} more)" if len(self.unreachable) > limit else ""
+            lines.append(f"{len(self.unreachable)} task(s) can never start: {shown}{more}")
+        return "\n".join(lines)
+
+    def raise_for_errors(self):
+        if not self.ok:
+            raise GraphError(self.describe(), self)
+
+
+def resolve(dependencies: Dict[str, Iterable[str]],
+            known: Callable[[str], bool] = lambda dep_id: False) -> GraphReport:
+    """
+    Validate a graph given as {task_id: dependency ids}. `known` accepts
+    dependency ids that live outside the graph (e.g. already-finished tasks).
+    """
+    report = GraphReport()
+    children: Dict[str, List[str]] = defaultdict(list)
+    indegree: Dict[str, int] = {}
+
+    for task_id, deps in dependencies.items():
+        degree = 0
+        for dep_id in deps:
+            if dep_id in dependencies:
+                children[dep_id].append(task_id)
+                degree += 1
+            elif not known(dep_id):
+                report.unknown.setdefault(task_id, []).append(dep_id)
+        indegree[task_id] = degree
+
+    # Kahn's algorithm; tasks with unknown dependencies are never seeded
+    order = report.order
+    order.extend(task_id for task_id, degree in indegree.items()
+                 if degree == 0 and task_id not in report.unknown)
+    for task_id in order:  # `order` grows while iterating
+        for child_id in children[task_id]:
+            indegree[child_id] -= 1
+            if indegree[child_id] == 0 and child_id not in report.unknown:
+                order.append(child_id)
+
+    if len(order) == len(dependencies):
+        return report
+
+    placed = set(order)
+    stuck = [task_id for task_id in dependencies if task_id not in placed]
+    report.cycles = _find_cycles(dependencies, stuck)
+    on_cycle = {task_id for path in report.cycles for task_id in path}
+    report.unreachable = [task_id for task_id in stuck
+                          if task_id not in on_cycle and task_id not in report.unknown]
+    return report
+
+
+def _find_cycles(dependencies: Dict[str, Iterable[str]], stuck: List[str]) -> List[List[str]]:
+    """Iterative DFS over the stuck tasks; every back edge closes one cycle."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = dict.fromkeys(stuck, WHITE)
+    cycles = []
+
+    for root in stuck:
+        if color[root] != WHITE:
+            continue
+        color[root] = GREY
+        path = [root]
+        stack = [iter(dependencies[root])]
+        while stack:
+            advanced = False
+            for dep_id in stack[-1]:
+                state = color.get(dep_id)
+                if state == WHITE:
+                    color[dep_id] = GREY
+                    path.append(dep_id)
+                    stack.append(iter(dependencies[dep_id]))
+                    advanced = True
+                    break
+                if state == GREY and len(cycles) < MAX_REPORTED_CYCLES:
+                    cycles.append(path[path.index(dep_id):] + [dep_id])
+            if not advanced:
+                color[path.pop()] = BLACK
+                stack.pop()
+    return cycles
+
+
+def find_path(start: str, target: str,
+              dependencies_of: Callable[[str], Iterable[str]]) -> Optional[List[str]]:
+    """Dependency chain from `start` down to `target`, or None if start doesn't depend on it."""
+    parents = {start: None}
+    frontier = [start]
+    while frontier:
+        node = frontier.pop()
+        if node == target:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+            return path[::-1]
+        for dep_id in dependencies_of(node):
+            if dep_id not in parents:
+                parents[dep_id] = node
+                frontier.append(dep_id)
+    return None
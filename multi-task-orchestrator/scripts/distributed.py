@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Distributed Workers.
+SQLite-backed job queue that lets an orchestrator (the coordinator) hand ready
+tasks to worker processes, on this host or on any host that can open the same
+database file.
+
+Workers lease one job at a time and extend their leases with heartbeats; a job
+whose lease runs out (worker killed, host gone) goes back on the queue and is
+leased again. Completions from a worker that lost its lease are ignored, so
+every job is reported once even though it may run more than once.
+
+    # Coordinator
+    orchestrator = Orchestrator(executor="broker", broker="run.db")
+
+    # Workers (any number, start before or after the coordinator)
+    python scripts/distributed.py worker --broker run.db
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import pickle
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    leases INTEGER NOT NULL DEFAULT 0,
+    ok INTEGER,
+    result BLOB,
+    duration REAL,
+    submitted REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, submitted);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    started REAL,
+    heartbeat REAL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class QueueBroker:
+    """
+    Job table shared by a coordinator and its workers. Job states:
+    queued -> leased -> done, and leased -> leased again once a lease expires.
+    Each process (and thread) opens its own QueueBroker on the same path.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def submit(self, job_id: str, task_id: str, func: Callable, args: tuple = (),
+               kwargs: Optional[dict] = None):
+        payload = pickle.dumps((func, args, kwargs or {}), protocol=pickle.HIGHEST_PROTOCOL)
+        self.open().conn.execute(
+            "INSERT INTO jobs (job_id, task_id, payload, state, submitted) VALUES (?, ?, ?, 'queued', ?)",
+            (job_id, task_id, payload, time.time())
+        )
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[tuple]:
+        """Claim the oldest queued (or lease-expired) job; returns (job_id, payload) or None."""
+        conn = self.open().conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id, payload FROM jobs "
+                "WHERE state = 'queued' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY submitted LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, "
+                    "leases = leases + 1 WHERE job_id = ?",
+                    (worker_id, now + lease_seconds, row[0])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def heartbeat(self, worker_id: str, lease_seconds: float):
+        """Mark the worker alive and extend the leases it holds."""
+        conn = self.open().conn
+        now = time.time()
+        conn.execute(
+            "INSERT INTO workers (worker_id, host, pid, started, heartbeat) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+            (worker_id, socket.gethostname(), os.getpid(), now, now)
+        )
+        conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE worker = ? AND state = 'leased'",
+            (now + lease_seconds, worker_id)
+        )
+
+    def complete(self, job_id: str, worker_id: str, ok: bool, value: Any,
+                 duration: float) -> bool:
+        """Store a result; returns False if the lease was lost (or the job cancelled)."""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            ok = False
+            detail = value if isinstance(value, BaseException) else e
+            blob = pickle.dumps(RuntimeError(f"{type(detail).__name__}: {detail}"))
+
+        conn = self.open().conn
+        updated = conn.execute(
+            "UPDATE jobs SET state = 'done', ok = ?, result = ?, duration = ? "
+            "WHERE job_id = ? AND worker = ? AND state = 'leased'",
+            (int(ok), blob, duration, job_id, worker_id)
+        ).rowcount
+        if updated:
+            conn.execute("UPDATE workers SET completed = completed + 1 WHERE worker_id = ?",
+                         (worker_id,))
+        return bool(updated)
+
+    def collect(self) -> List[tuple]:
+        """Remove and return finished jobs as (job_id, ok, value, worker, leases, duration)."""
+        conn = self.open().conn
+        rows = conn.execute(
+            "SELECT job_id, ok, result, worker, leases, duration FROM jobs WHERE state = 'done'"
+        ).fetchall()
+        if not rows:
+            return []
+        conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(row[0],) for row in rows])
+
+        finished = []
+        for job_id, ok, blob, worker, leases, duration in rows:
+            try:
+                value = pickle.loads(blob)
+            except Exception as e:
+                ok, value = 0, RuntimeError(f"Result not loadable: {type(e).__name__}: {e}")
+            finished.append((job_id, bool(ok), value, worker, leases, duration))
+        return finished
+
+    def cancel(self, job_id: str):
+        """Drop a job; a worker still running it will find its completion ignored."""
+        self.open().conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def workers(self, timeout: float) -> Dict[str, Dict]:
+        """Registered workers, flagged alive if they heartbeated within `timeout` seconds."""
+        now = time.time()
+        rows = self.open().conn.execute(
+            "SELECT worker_id, host, pid, heartbeat, completed FROM workers"
+        )
+        return {
+            worker_id: {"host": host, "pid": pid, "completed": completed,
+                        "alive": now - heartbeat <= timeout}
+            for worker_id, host, pid, heartbeat, completed in rows
+        }
+
+
+class BrokerWorker:
+    """Runs jobs from a QueueBroker until stopped, idle too long or out of jobs."""
+
+    def __init__(self, path: str, worker_id: Optional[str] = None,
+                 lease: float = 10.0, heartbeat: Optional[float] = None,
+                 poll: float = 0.05):
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease = lease
+        self.heartbeat_interval = heartbeat or lease / 3
+        self.poll = poll
+        self.completed = 0
+        self._stop = threading.Event()
+
+    def _heartbeat_loop(self):
+        # Own connection: sqlite3 connections stay on the thread that made them
+        broker = QueueBroker(self.path).open()
+        try:
+            while not self._stop.wait(self.heartbeat_interval):
+                broker.heartbeat(self.worker_id, self.lease)
+        finally:
+            broker.close()
+
+    def _execute(self, payload: bytes) -> tuple:
+        start = time.monotonic()
+        try:
+            func, args, kwargs = pickle.loads(payload)
+            if asyncio.iscoroutinefunction(func):
+                value = asyncio.run(func(*args, **kwargs))
+            else:
+                value = func(*args, **kwargs)
+            ok = True
+        except Exception as e:
+            ok, value = False, e
+        return ok, value, time.monotonic() - start
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, idle_timeout: Optional[float] = None) -> int:
+        """Lease and run jobs; returns how many results were accepted."""
+        broker = QueueBroker(self.path).open()
+        broker.heartbeat(self.worker_id, self.lease)
+        beat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        beat.start()
+
+        idle_since = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if max_jobs is not None and self.completed >= max_jobs:
+                    break
+                job = broker.lease(self.worker_id, self.lease)
+                if job is None:
+                    if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                        break
+                    self._stop.wait(self.poll)
+                    continue
+
+                job_id, payload = job
+                ok, value, duration = self._execute(payload)
+                if broker.complete(job_id, self.worker_id, ok, value, duration):
+                    self.completed += 1
+                idle_since = time.monotonic()
+        finally:
+            self._stop.set()
+            beat.join(timeout=5)
+            broker.close()
+        return self.completed
+
+
+def run_worker(path: str, idle_timeout: Optional[float] = None, **options) -> int:
+    """Entry point for worker processes (picklable for multiprocessing)."""
+    return BrokerWorker(path, **options).run(idle_timeout=idle_timeout)
+
+
+def start_local_workers(path: str, count: int, **options) -> List[multiprocessing.Process]:
+    """Start `count` worker processes on this host; terminate them when the run is done."""
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(target=run_worker, args=(path,), kwargs=options,
+                                          daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+class BrokerClient:
+    """
+    Coordinator side: submit jobs and await their results from the event loop.
+    Database calls run on one dedicated thread (which owns the connection), so
+    a busy database stalls that thread, not the scheduler.
+    """
+
+    def __init__(self, path: str, poll: float = 0.02, lease: float = 10.0):
+        self.broker = QueueBroker(path)  # Opened on first use, on the database thread
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="broker-db")
+        self.poll = poll
+        self.lease = lease
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.releases = 0  # Jobs handed to another worker after a lease expired
+        self.per_worker: Dict[str, int] = {}
+
+    async def _call(self, method: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._db, method, *args)
+
+    async def run(self, task_id: str, func: Callable, args: tuple = (),
+                  kwargs: Optional[dict] = None) -> Any:
+        job_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = future
+        try:
+            await self._call(self.broker.submit, job_id, task_id, func, args, kwargs)
+            self.submitted += 1
+            if self._poller is None or self._poller.done():
+                self._poller = asyncio.ensure_future(self._poll())
+            return await future
+        except asyncio.CancelledError:
+            self._db.submit(self.broker.cancel, job_id)  # Queued after the submit, never lost
+            raise
+        finally:
+            self._pending.pop(job_id, None)
+
+    async def _poll(self):
+        while self._pending:
+            for job_id, ok, value, worker, leases, _ in await self._call(self.broker.collect):
+                self.releases += max(0, leases - 1)
+                self.per_worker[worker] = self.per_worker.get(worker, 0) + 1
+                future = self._pending.get(job_id)
+                if future is None or future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            await asyncio.sleep(self.poll)
+
+    def snapshot(self) -> Dict:
+        # A plain read: in WAL mode it never waits on a writer's lock
+        workers = self._db.submit(self.broker.workers, self.lease).result()
+        return {
+            "submitted": self.submitted,
+            "released_after_timeout": self.releases,
+            "completed_by_worker": dict(self.per_worker),
+            "workers": workers,
+        }
+
+    def shutdown(self):
+        """Cancel outstanding jobs and close the database without waiting on it."""
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        for job_id in list(self._pending):
+            self._db.submit(self.broker.cancel, job_id)
+        self._db.submit(self.broker.close)
+        self._db.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Orchestrator Broker Worker')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    worker = sub.add_parser('worker', help='Run jobs from a broker database')
+    worker.add_argument('--broker', '-b', required=True, help='Broker SQLite database path')
+    worker.add_argument('--processes', '-n', type=int, default=1,
+                        help='Worker processes to start on this host')
+    worker.add_argument('--lease', type=float, default=10.0,
+                        help='Seconds without a heartbeat before a job is re-leased')
+    worker.add_argument('--idle-timeout', type=float,
+                        help='Exit after this many idle seconds')
+    worker.add_argument('--path', action='append', default=[],
+                        help='Extra import path for task modules (repeatable)')
+
+    status = sub.add_parser('status', help='Show queue depth and workers')
+    status.add_argument('--broker', '-b', required=True, help='Broker SQLite database path')
+    status.add_argument('--lease', type=float, default=10.0)
+
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        broker = QueueBroker(args.broker).open()
+        for state, count in broker.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+            print(f"{state:<8} {count}")
+        for worker_id, info in broker.workers(args.lease).items():
+            print(f"{worker_id}: {'alive' if info['alive'] else 'dead'}, "
+                  f"{info['completed']} completed")
+        return 0
+
+    for extra in args.path:
+        sys.path.insert(0, extra)
+    if args.processes == 1:
+        run_worker(args.broker, idle_timeout=args.idle_timeout, lease=args.lease)
+        return 0
+
+    processes = start_local_workers(args.broker, args.processes,
+                                    idle_timeout=args.idle_timeout, lease=args.lease)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Duration History.
+Per-task-name run-time estimates carried across orchestrations for critical-path scheduling.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class DurationHistory:
+    """Exponentially weighted average duration per task name, optionally persisted to JSON."""
+
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.3,
+                 default: float = 1.0):
+        self.path = Path(path) if path else None
+        self.alpha = alpha
+        self.default = default
+        self.durations: Dict[str, float] = {}
+        self.samples: Dict[str, int] = {}
+        self._total = 0.0  # Running sum of durations, so estimate() for unseen names is O(1)
+        self.load()
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load duration history: {e}")
+            return
+        for name, entry in data.get("tasks", {}).items():
+            self._total += entry["avg_duration"] - self.durations.get(name, 0.0)
+            self.durations[name] = entry["avg_duration"]
+            self.samples[name] = entry.get("samples", 1)
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "tasks": {
+                name: {"avg_duration": round(duration, 6), "samples": self.samples.get(name, 1)}
+                for name, duration in sorted(self.durations.items())
+            }
+        }
+        with open(self.path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def update(self, name: str, duration: float):
+        previous = self.durations.get(name)
+        self.durations[name] = (duration if previous is None
+                                else self.alpha * duration + (1 - self.alpha) * previous)
+        self._total += self.durations[name] - (previous or 0.0)
+        self.samples[name] = self.samples.get(name, 0) + 1
+
+    def estimate(self, name: str) -> float:
+        """Known average for this name, else the mean of everything seen, else the default."""
+        if name in self.durations:
+            return self.durations[name]
+        if self.durations:
+            return self._total / len(self.durations)
+        return self.default
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Run Journal.
+Append-only SQLite (WAL) checkpoint log so interrupted orchestrations can resume.
+"""
+
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    task_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output BLOB,
+    error TEXT,
+    duration REAL,
+    started_at TEXT,
+    completed_at TEXT,
+    attempts INTEGER,
+    PRIMARY KEY (task_id, fingerprint)
+)
+"""
+
+
+class RunJournal:
+    """Checkpoint task results keyed by task id plus an args fingerprint."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn: Optional[sqlite3.Connection] = None
+        self.writes = 0
+
+    def open(self):
+        """Open the journal; WAL + synchronous=NORMAL keeps commits well under 1 ms."""
+        if self.conn is None:
+            self.conn = sqlite3.connect(str(self.path), isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(SCHEMA)
+        return self
+
+    def close(self):
+        """Close the journal connection."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def load_successes(self) -> Dict[tuple, Dict[str, Any]]:
+        """Return recorded successes as {(task_id, fingerprint): record}."""
+        self.open()
+        records = {}
+        rows = self.conn.execute(
+            "SELECT task_id, fingerprint, output, duration, started_at, completed_at, attempts "
+            "FROM results WHERE status = 'success'"
+        )
+        for task_id, fingerprint, output, duration, started_at, completed_at, attempts in rows:
+            try:
+                value = pickle.loads(output) if output is not None else None
+            except Exception:
+                continue  # Output no longer loadable; rerun the task
+            records[(task_id, fingerprint)] = {
+                "output": value,
+                "duration": duration,
+                "started_at": started_at,
+                "completed_at": completed_at,
+                "attempts": attempts,
+            }
+        return records
+
+    def record(self, task_id: str, fingerprint: str, status: str, output: Any = None,
+               error: Optional[str] = None, duration: float = 0.0,
+               started_at: Optional[str] = None, completed_at: Optional[str] = None,
+               attempts: int = 0):
+        """Append a final task result; successes with unpicklable output are rerun on resume."""
+        self.open()
+        blob = None
+        if status == "success":
+            try:
+                blob = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                status = "unrecorded"
+                error = f"Output not serializable: {type(e).__name__}"
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task_id, fingerprint, status, blob, error, duration,
+             started_at, completed_at, attempts)
+        )
+        self.writes += 1
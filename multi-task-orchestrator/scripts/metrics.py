@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Live Metrics.
+Prometheus text-format metrics for long orchestrations, served over local HTTP
+and/or written to a file (e.g. for node_exporter's textfile collector).
+
+The event loop only bumps counters and, once per interval, renders a snapshot
+string; the HTTP server and file writer run on daemon threads and just hand
+out the latest snapshot, so scrapes never touch scheduler state.
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram in Prometheus' le= convention."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def render(self, name: str) -> List[str]:
+        lines = [f"# HELP {name} Task attempt duration in seconds.", f"# TYPE {name} histogram"]
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {running}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsExporter:
+    """Counters fed by the orchestrator plus periodic rendering and export."""
+
+    def __init__(self, port: Optional[int] = None, path: Optional[str] = None,
+                 interval: float = 1.0, host: str = "127.0.0.1"):
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self.host = host
+
+        self.latency = LatencyHistogram()
+        self.completed: Dict[str, int] = {}
+        self.attempts = 0
+        self.text = ""
+
+        self._orchestrator = None
+        self._timer = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    # Hooks called from the event loop (keep them O(1))
+
+    def attempt_finished(self, seconds: float):
+        self.attempts += 1
+        self.latency.observe(seconds)
+
+    def task_completed(self, status: str):
+        self.completed[status] = self.completed.get(status, 0) + 1
+
+    # Lifecycle
+
+    def start(self, orchestrator, loop):
+        """Reset counters for a new run and begin refreshing/exporting."""
+        self._orchestrator = orchestrator
+        self.latency = LatencyHistogram(self.latency.buckets)
+        self.completed = {}
+        self.attempts = 0
+        self._stop.clear()
+        self.refresh()
+
+        def tick():
+            self.refresh()
+            self._timer = loop.call_later(self.interval, tick)
+        self._timer = loop.call_later(self.interval, tick)
+
+        if self.port is not None and self._server is None:
+            self._serve()
+            print(f"Metrics: {self.url}")
+        if self.path:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+    def stop(self):
+        """Render final values, write the file once more and shut the HTTP server down."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.refresh()
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+            self._writer = None
+        if self.path:
+            self._write()
+        self.close()
+
+    def close(self):
+        """Shut the HTTP server down (blocks for up to its poll interval)."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> Optional[str]:
+        if self._server is None:
+            return None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    # Rendering (event loop thread, once per interval)
+
+    def refresh(self):
+        o = self._orchestrator
+        lines = []
+
+        def gauge(name: str, help_text: str, value):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"])
+
+        parked = sum(len(entries) for entries in o._parked.values())
+        retrying = sum(1 for task_id in o._delayed.values() if task_id is not None)
+        running = len(o._running)
+        queued = len(o._ready) + parked
+        gauge("orchestrator_tasks_queued", "Tasks ready to run (including resource-blocked).", queued)
+        gauge("orchestrator_tasks_running", "Task attempts in flight.", running)
+        gauge("orchestrator_tasks_retry_wait", "Tasks waiting out a retry backoff.", retrying)
+        gauge("orchestrator_tasks_blocked", "Tasks waiting on dependencies.",
+              max(0, o._unfinished - queued - running - retrying))
+        gauge("orchestrator_concurrency_limit", "Current cap on running tasks.", o.concurrency_limit)
+
+        lines.extend(["# HELP orchestrator_tasks_completed_total Finished tasks by final status.",
+                      "# TYPE orchestrator_tasks_completed_total counter"])
+        for status in ("success", "failed", "skipped", "cancelled"):
+            lines.append(f'orchestrator_tasks_completed_total{{status="{status}"}} '
+                         f'{self.completed.get(status, 0)}')
+
+        for name, help_text, value in (
+            ("orchestrator_task_attempts_total", "Task attempts finished.", self.attempts),
+            ("orchestrator_task_retries_total", "Attempts re-queued for retry.", o.retries_used),
+            ("orchestrator_cache_hits_total", "Tasks served from the result cache.", o.cache_hits),
+            ("orchestrator_coalesced_total", "Tasks attached to an in-flight duplicate.", o.coalesced),
+        ):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"])
+
+        resources = o.resources
+        tags = sorted(set(resources.limits) | set(resources.in_use))
+        if tags:
+            lines.extend(["# HELP orchestrator_resource_in_use Running tasks holding each resource tag.",
+                          "# TYPE orchestrator_resource_in_use gauge"])
+            for tag in tags:
+                lines.append(f'orchestrator_resource_in_use{{resource="{_label(tag)}"}} '
+                             f'{resources.in_use.get(tag, 0)}')
+            lines.extend(["# HELP orchestrator_resource_limit Concurrency cap per resource tag.",
+                          "# TYPE orchestrator_resource_limit gauge"])
+            for tag in sorted(resources.limits):
+                lines.append(f'orchestrator_resource_limit{{resource="{_label(tag)}"}} '
+                             f'{resources.limits[tag]}')
+
+        lines.extend(self.latency.render("orchestrator_task_duration_seconds"))
+        gauge("orchestrator_last_refresh_timestamp_seconds", "When these values were rendered.",
+              f"{time.time():.3f}")
+        self.text = "\n".join(lines) + "\n"
+
+    # Export (daemon threads; only read self.text)
+
+    def _serve(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.text.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the run's output
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.1},
+                         daemon=True).start()
+
+    def _write(self):
+        # Write then rename so readers never see a half-written file
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.text)
+        os.replace(tmp, self.path)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._write()
+            except OSError as e:
+                print(f"Warning: Could not write metrics file: {e}")
@@ -5,14 +5,41 @@ Run multiple parallel AI agent tasks with dependency management.
 """
 
 import asyncio
+import functools
+import hashlib
+import heapq
 import json
+import os
+import pickle
+import random
+import re
+import sys
 import time
+from collections import defaultdict, deque
+from concurrent.futures import Future as ConcurrentFuture, ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Callable, Optional
+from typing import List, Dict, Any, Callable, Optional, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum
+from pathlib import Path
 import traceback
 
+# Import local orchestration modules
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir))
+
+from journal import RunJournal
+from result_cache import CachePolicy, ResultCache, MISS
+from resources import ResourcePool
+from adaptive import AIMDLimit
+from tracing import Tracer
+from history import DurationHistory
+from workers import KillableWorkerPool, call_pickled
+from distributed import BrokerClient
+from result_store import OutputStore
+from metrics import MetricsExporter
+from dependency_resolver import GraphError, GraphReport, find_path, resolve
+
 
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -20,17 +47,78 @@ class TaskStatus(Enum):
     SUCCESS = "success"
     FAILED = "failed"
     SKIPPED = "skipped"
+    CANCELLED = "cancelled"
 
 
-@dataclass
 class TaskResult:
-    task_id: str
-    status: TaskStatus
-    output: Any = None
-    error: Optional[str] = None
-    duration: float = 0.0
-    started_at: Optional[str] = None
-    completed_at: Optional[str] = None
+    """
+    Outcome of one task. Slotted to stay small across 100k-task runs; large
+    outputs can be spilled to an OutputStore and are loaded again on access.
+    """
+    
+    __slots__ = ("task_id", "status", "_output", "_spilled", "error", "duration",
+                 "started_at", "completed_at", "attempts")
+    
+    def __init__(self, task_id: str, status: TaskStatus, output: Any = None,
+                 error: Optional[str] = None, duration: float = 0.0,
+                 started_at: Optional[str] = None, completed_at: Optional[str] = None,
+                 attempts: int = 0):
+        self.task_id = task_id
+        self.status = status
+        self._output = output
+        self._spilled: Optional[tuple] = None  # (store, offset, length)
+        self.error = error
+        self.duration = duration
+        self.started_at = started_at
+        self.completed_at = completed_at
+        self.attempts = attempts
+    
+    @property
+    def output(self) -> Any:
+        if self._spilled is not None:
+            store, offset, length = self._spilled
+            return store.get(offset, length)
+        return self._output
+    
+    @output.setter
+    def output(self, value: Any):
+        self._output = value
+        self._spilled = None
+    
+    @property
+    def spilled(self) -> bool:
+        return self._spilled is not None
+    
+    def spill(self, store: OutputStore):
+        """Move the output to disk if it is over the store's threshold."""
+        if self._spilled is not None or self._output is None:
+            return
+        ref = store.put(self._output)
+        if ref is not None:
+            self._spilled = (store, *ref)
+            self._output = None
+    
+    def adopt_output(self, other: "TaskResult"):
+        """Share another result's output (spilled or not) without loading it."""
+        self._output = other._output
+        self._spilled = other._spilled
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "status": self.status.value,
+            "output": self.output,
+            "error": self.error,
+            "duration": self.duration,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "attempts": self.attempts
+        }
+    
+    def __repr__(self):
+        output = "<spilled>" if self._spilled is not None else repr(self._output)
+        return (f"TaskResult(task_id={self.task_id!r}, status={self.status}, output={output}, "
+                f"error={self.error!r}, duration={self.duration!r}, attempts={self.attempts})")
 
 
 @dataclass
@@ -42,30 +130,251 @@ class Task:
     kwargs: dict = field(default_factory=dict)
     dependencies: List[str] = field(default_factory=list)
     timeout: float = 300.0
-    retries: int = 3
+    retries: int = 3  # Total attempts, including the first
     priority: int = 0  # Higher = more important
+    executor: Optional[str] = None  # thread, process, inline, killable (None = orchestrator default)
+    cache: Optional[CachePolicy] = None  # Opt-in memoization of successful outputs
+    resources: List[str] = field(default_factory=list)  # e.g. ["steel", "wp:smarthomewizards.com"]
+    context: bool = False  # Pass a TaskContext as `ctx=` so the task can add subtasks
+    dedup_key: Optional[str] = None  # Tasks sharing a key while one is in flight run once
+    deadline: Optional[Union[datetime, float]] = None  # Wall-clock finish-by time (datetime or epoch seconds)
+
+
+EXECUTORS = ("thread", "process", "inline", "killable", "broker")
+SCHEDULING_POLICIES = ("priority", "critical_path", "edf")
+
+
+def deadline_timestamp(deadline: Optional[Union[datetime, float]]) -> Optional[float]:
+    """Normalize a Task.deadline to epoch seconds."""
+    if deadline is None:
+        return None
+    return deadline.timestamp() if isinstance(deadline, datetime) else float(deadline)
+
+
+_ADDRESS_REPR = re.compile(r" at 0x[0-9a-fA-F]+>")
+
+
+def _stable_repr(value: Any) -> str:
+    """repr() that is the same in every process; default object reprs embed an address."""
+    text = repr(value)
+    if _ADDRESS_REPR.search(text):
+        raise TypeError(f"{type(value).__qualname__} has no stable repr")
+    return text
+
+
+def _canonical(value: Any) -> Any:
+    """
+    JSON-ready form of an argument. JSON values pass through unchanged; sets
+    are sorted, dicts with non-string keys become sorted [key, value] pairs,
+    and other objects are named by their type and repr.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: _canonical(item) for key, item in value.items()}
+        pairs = [[_canonical(key), _canonical(item)] for key, item in value.items()]
+        return {"<dict>": sorted(pairs, key=lambda pair: json.dumps(pair, sort_keys=True))}
+    if isinstance(value, (set, frozenset)):
+        items = [_canonical(item) for item in value]
+        return {"<set>": sorted(items, key=lambda item: json.dumps(item, sort_keys=True))}
+    if isinstance(value, (bytes, bytearray)):
+        return {"<bytes>": value.hex()}
+    kind = type(value)
+    return {"<object>": f"{kind.__module__}.{kind.__qualname__}", "repr": _stable_repr(value)}
+
+
+def fingerprint(func: Callable, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+    """
+    Stable hash of a function's qualified name and its arguments. Arguments
+    are JSON values, bytes, sets, dicts with any keys, or objects with a
+    stable repr; anything else raises TypeError and the task is neither
+    cached nor journaled.
+    """
+    while isinstance(func, functools.partial):
+        args = func.args + tuple(args)
+        kwargs = {**func.keywords, **(kwargs or {})}
+        func = func.func
+    qualname = getattr(func, "__qualname__", None)
+    name = f"{getattr(func, '__module__', '')}.{qualname}" if qualname else _stable_repr(func)
+    payload = json.dumps([name, _canonical(list(args)), _canonical(kwargs or {})], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TaskContext:
+    """
+    Handle passed to running tasks created with Task(context=True) as the
+    `ctx` keyword argument. Lets a task grow the live graph, e.g. a crawl
+    task adding one audit task per discovered URL that an aggregate waits on.
+    Safe to call from the event loop or from a thread-pool task.
+    """
+    
+    def __init__(self, orchestrator: "Orchestrator", task_id: str,
+                 loop: asyncio.AbstractEventLoop):
+        self.orchestrator = orchestrator
+        self.task_id = task_id
+        self.loop = loop
+    
+    def _on_loop(self, fn: Callable, *args):
+        try:
+            if asyncio.get_running_loop() is self.loop:
+                return fn(*args)
+        except RuntimeError:
+            pass  # Called from a worker thread
+        done = ConcurrentFuture()
+        
+        def call():
+            try:
+                done.set_result(fn(*args))
+            except Exception as e:
+                done.set_exception(e)
+        
+        self.loop.call_soon_threadsafe(call)
+        return done.result()
+    
+    def add_task(self, task: Task, required_by: List[str] = ()):
+        """Add a task to the running orchestration; `required_by` tasks will wait for it."""
+        self._on_loop(self.orchestrator._add_dynamic_task, task, list(required_by))
+    
+    def add_tasks(self, tasks: List[Task], required_by: List[str] = ()):
+        for task in tasks:
+            self.add_task(task, required_by)
+    
+    def add_dependency(self, task_id: str, dep_id: str):
+        """Make a not-yet-ready task also wait for `dep_id`."""
+        self._on_loop(self.orchestrator._add_edge, task_id, dep_id)
 
 
 class Orchestrator:
     """Orchestrate parallel task execution with dependencies."""
     
-    def __init__(self, max_concurrent: int = 5, on_failure: str = "continue"):
-        self.max_concurrent = max_concurrent
+    def __init__(self, max_concurrent: int = 5, on_failure: str = "continue",
+                 executor: str = "thread", max_workers: Optional[int] = None,
+                 retry_budget: Optional[int] = None, retry_backoff: float = 1.0,
+                 max_backoff: float = 30.0, journal: Optional[str] = None,
+                 cache_dir: str = ".orchestrator-cache", cache_size: int = 1024,
+                 resource_limits: Optional[Dict[str, int]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 adaptive: bool = False, concurrency_bounds: tuple = (1, 64),
+                 trace: bool = False, scheduling: str = "priority",
+                 history: Optional[str] = None, broker: Optional[str] = None,
+                 broker_lease: float = 10.0, spill_threshold: Optional[int] = None,
+                 spill_dir: str = ".orchestrator-spill",
+                 metrics_port: Optional[int] = None, metrics_file: Optional[str] = None,
+                 metrics_interval: float = 1.0):
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+        if scheduling not in SCHEDULING_POLICIES:
+            raise ValueError(f"scheduling must be one of {SCHEDULING_POLICIES}, got {scheduling!r}")
+        
+        self.max_concurrent = max_concurrent  # Starting point when adaptive
         self.on_failure = on_failure  # continue, abort, retry
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.executor = executor  # Default backend for sync task funcs
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._killable_pool: Optional[KillableWorkerPool] = None  # Workers killed on timeout
+        self.workers_killed = 0
+        
+        # Coordinator mode: "broker" tasks are queued in a SQLite database that
+        # worker processes (scripts/distributed.py) lease jobs from
+        self.broker = broker
+        self.broker_lease = broker_lease
+        self._broker_client: Optional[BrokerClient] = None
+        self.broker_stats: Optional[Dict] = None
+        
+        # Retries wait outside the concurrency slot, then re-enter the ready queue
+        self.retry_budget = retry_budget  # Max retries across the whole run (None = unlimited)
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.retries_used = 0
+        self.retry_budget_exhausted = False
+        
+        # Optional checkpoint journal; succeeded tasks are skipped on resume
+        self.journal = RunJournal(journal) if journal else None
+        self._journal_records: Dict[tuple, Dict[str, Any]] = {}
+        self.resumed = 0
+        
+        # Shared by all tasks that set a cache policy
+        self.cache = ResultCache(cache_dir, max_entries=cache_size)
+        self.cache_hits = 0
+        self._fingerprints: Dict[str, Optional[str]] = {}
+        
+        # Per-resource concurrency caps and requests-per-second buckets
+        self.resource_limits = resource_limits or {}
+        self.rate_limits = rate_limits or {}
+        self.resources = ResourcePool(self.resource_limits, self.rate_limits)
+        self._parked: Dict[str, List[tuple]] = defaultdict(list)  # Ready but resource-blocked
+        self._wake_pending: set = set()
+        
+        # AIMD: grow the limit while healthy, halve it on errors/timeouts/latency spikes
+        self.adaptive = adaptive
+        self.concurrency_bounds = concurrency_bounds
+        self.aimd: Optional[AIMDLimit] = None
+        
+        # Optional per-task timelines (enqueue, ready, slot, attempts, completion)
+        self.trace = trace
+        self.tracer: Optional[Tracer] = None
+        
+        # Ready-task ordering; critical_path ranks tasks by their longest
+        # downstream chain of historical durations (keyed by task name)
+        self.scheduling = scheduling
+        self.history = DurationHistory(history)
+        self._ranks: Dict[str, float] = {}
+        
+        # Deadlines: own (per task), effective (EDF, inherited from dependents),
+        # tasks predicted to finish late, and tasks that did
+        self._own_deadlines: Dict[str, float] = {}
+        self._deadlines: Dict[str, float] = {}
+        self.deadline_risks: Dict[str, Dict] = {}
+        self.deadline_misses: List[str] = []
+        self._deadlines_met = 0
+        
+        # Outputs whose pickled size reaches spill_threshold bytes go to disk
+        # and are loaded back only when read (None = keep everything in memory)
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self.output_store: Optional[OutputStore] = None
+        
+        # Live Prometheus-format metrics over HTTP (port 0 = any free port)
+        # and/or a file rewritten every metrics_interval seconds
+        self.metrics: Optional[MetricsExporter] = None
+        if metrics_port is not None or metrics_file:
+            self.metrics = MetricsExporter(metrics_port, metrics_file, metrics_interval)
         
         self.tasks: Dict[str, Task] = {}
         self.results: Dict[str, TaskResult] = {}
-        self.task_events: Dict[str, asyncio.Event] = {}
+        
+        # Scheduler state (rebuilt on every run)
+        self._indegree: Dict[str, int] = {}
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+        self._ready: List[tuple] = []
+        self._running: Dict[asyncio.Future, str] = {}
+        self._delayed: Dict[asyncio.TimerHandle, Optional[str]] = {}  # Backoff/wake timers -> retrying task id
+        self._finished: deque = deque()  # Completed task ids not yet yielded by stream()
+        self._unfinished = 0
+        self._evicted: Dict[TaskStatus, int] = defaultdict(int)
+        self._evicted_failures: set = set()
+        self._evicted_ok: set = set()  # Yielded-and-dropped successes, so late dependents still see them
+        self._seq = 0
         
         self.started_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
         self.aborted = False
+        self.abort_info: Optional[Dict] = None
+        self.dynamic_tasks = 0
+        self._wakeup: Optional[asyncio.Future] = None
+        self._unpicklable: set = set()  # Task ids that fell back to threads
+        
+        # Single-flight: dedup key -> in-flight leader, leader -> attached followers
+        self._inflight: Dict[str, str] = {}
+        self._followers: Dict[str, List[str]] = {}
+        self.coalesced = 0
     
     def add_task(self, task: Task):
         """Add a task to the orchestrator."""
         self.tasks[task.id] = task
-        self.task_events[task.id] = asyncio.Event()
         self.results[task.id] = TaskResult(
             task_id=task.id,
             status=TaskStatus.PENDING
@@ -76,159 +385,1015 @@ class Orchestrator:
         for task in tasks:
             self.add_task(task)
     
-    async def _wait_for_dependencies(self, task: Task) -> bool:
-        """Wait for all task dependencies to complete."""
+    def _reset_run_state(self):
+        """Clear scheduler state and counters before a run."""
+        self._indegree = {}
+        self._dependents = defaultdict(list)
+        self._ready = []
+        self._running = {}
+        self._delayed = {}
+        self._finished = deque()
+        self._unfinished = 0
+        self._evicted = defaultdict(int)
+        self._evicted_failures = set()
+        self._evicted_ok = set()
+        self._seq = 0
+        self.resources = ResourcePool(self.resource_limits, self.rate_limits)
+        self._parked = defaultdict(list)
+        self._wake_pending = set()
+        if self.adaptive:
+            low, high = self.concurrency_bounds
+            self.aimd = AIMDLimit(self.max_concurrent, min_limit=low, max_limit=high)
+        self.tracer = Tracer() if self.trace else None
+        self.retries_used = 0
+        self.retry_budget_exhausted = False
+        self.workers_killed = 0
+        self.broker_stats = None
+        self._own_deadlines = {}
+        self._deadlines = {}
+        self.deadline_risks = {}
+        self.deadline_misses = []
+        self._deadlines_met = 0
+        self.dynamic_tasks = 0
+        self._inflight = {}
+        self._unpicklable = set()
+        self._followers = {}
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.resumed = 0
+        self._fingerprints = {}
+        
+        if self.output_store is not None:
+            self.output_store.close()  # Results of the previous run are being replaced
+            self.output_store = None
+        if self.spill_threshold is not None:
+            self.output_store = OutputStore(self.spill_dir, self.spill_threshold)
+        
+        for task_id in self.tasks:
+            self.results[task_id] = TaskResult(task_id=task_id, status=TaskStatus.PENDING)
+        self._journal_records = self.journal.open().load_successes() if self.journal else {}
+    
+    def validate(self) -> GraphReport:
+        """
+        Check the added tasks in O(V+E): topological order, dependency cycles
+        (with the offending path), unknown dependency ids and tasks that could
+        never start because of either. Does not raise; see GraphReport.ok.
+        """
+        return resolve({task_id: task.dependencies for task_id, task in self.tasks.items()})
+    
+    def _build_graph(self):
+        """Register every added task; in-degrees are computed once per run."""
+        if self.scheduling == "critical_path":
+            self._ranks = self._downstream_ranks()
+        if any(task.deadline is not None for task in self.tasks.values()):
+            self._plan_deadlines()
+        for task in list(self.tasks.values()):
+            self._register(task)
+    
+    def _topology(self) -> tuple:
+        """Children lists and a topological order (Kahn's algorithm) of the added tasks."""
+        children: Dict[str, List[str]] = defaultdict(list)
+        indegree = {task_id: 0 for task_id in self.tasks}
+        for task in self.tasks.values():
+            for dep_id in task.dependencies:
+                if dep_id in self.tasks:
+                    children[dep_id].append(task.id)
+                    indegree[task.id] += 1
+        
+        order = [task_id for task_id, degree in indegree.items() if degree == 0]
+        for task_id in order:  # `order` grows while iterating
+            for child_id in children[task_id]:
+                indegree[child_id] -= 1
+                if indegree[child_id] == 0:
+                    order.append(child_id)
+        return children, order
+    
+    def _downstream_ranks(self) -> Dict[str, float]:
+        """
+        Longest path from each task to a sink, in estimated seconds (the
+        task's own estimate included). Computed in reverse topological order.
+        """
+        children, order = self._topology()
+        estimates = {task_id: self.history.estimate(task.name)
+                     for task_id, task in self.tasks.items()}
+        ranks = dict(estimates)  # Tasks stuck in a cycle keep their own estimate
+        for task_id in reversed(order):
+            downstream = max((ranks[c] for c in children[task_id]), default=0.0)
+            ranks[task_id] = estimates[task_id] + downstream
+        return ranks
+    
+    def _plan_deadlines(self):
+        """
+        Before anything runs: give EDF each task's effective deadline (its
+        own, or earlier if a dependent needs it done sooner) and flag deadline
+        tasks whose dependency chain already can't finish in time.
+        """
+        children, order = self._topology()
+        estimates = {task_id: self.history.estimate(task.name)
+                     for task_id, task in self.tasks.items()}
+        
+        if self.scheduling == "edf":
+            for task_id in reversed(order):
+                candidates = [self._deadlines[c] - estimates[c]
+                              for c in children[task_id] if c in self._deadlines]
+                own = deadline_timestamp(self.tasks[task_id].deadline)
+                if own is not None:
+                    candidates.append(own)
+                if candidates:
+                    self._deadlines[task_id] = min(candidates)
+        
+        # Earliest possible finish ignores slot limits, so a flag here is a sure miss
+        now = time.time()
+        finish: Dict[str, float] = {}
+        for task_id in order:
+            task = self.tasks[task_id]
+            ready = max((finish[d] for d in task.dependencies if d in finish), default=now)
+            finish[task_id] = ready + estimates[task_id]
+            if task.deadline is not None:
+                self._flag_deadline_risk(task, finish[task_id], "planning")
+    
+    def _flag_deadline_risk(self, task: Task, predicted_finish: float, stage: str):
+        """Record (once) and warn about a task predicted to finish after its deadline."""
+        deadline = deadline_timestamp(task.deadline)
+        if task.id in self.deadline_risks or predicted_finish <= deadline:
+            return
+        late_by = predicted_finish - deadline
+        self.deadline_risks[task.id] = {
+            "deadline": datetime.fromtimestamp(deadline).isoformat(),
+            "predicted_finish": datetime.fromtimestamp(predicted_finish).isoformat(),
+            "late_by": round(late_by, 3),
+            "flagged_at": stage,
+        }
+        print(f"Warning: Task {task.id} is predicted to miss its deadline by {late_by:.1f}s")
+    
+    def _check_deadline(self, task_id: str):
+        """Count a finished deadline task as met or missed."""
+        result = self.results[task_id]
+        if result.status == TaskStatus.SUCCESS and time.time() <= self._own_deadlines[task_id]:
+            self._deadlines_met += 1
+        else:
+            self.deadline_misses.append(task_id)
+    
+    def _register(self, task: Task):
+        """Wire a task into the live graph, queueing it if it is already runnable."""
+        self._unfinished += 1
+        if task.deadline is not None:
+            self._own_deadlines[task.id] = deadline_timestamp(task.deadline)
+        if self.tracer:
+            self.tracer.enqueued(task.id, task.name)
+        if self._restore_from_journal(task):
+            self._complete(task.id)
+            return
+        
+        degree = 0
+        deps_failed = False
         for dep_id in task.dependencies:
-            if dep_id not in self.task_events:
-                print(f"Warning: Unknown dependency {dep_id} for task {task.id}")
+            dep = self.results.get(dep_id)
+            if dep is None:
+                if dep_id in self._evicted_failures:
+                    deps_failed = True
+                elif dep_id not in self._evicted_ok:
+                    print(f"Warning: Unknown dependency {dep_id} for task {task.id}")
                 continue
-            
-            # Wait for dependency to complete
-            await self.task_events[dep_id].wait()
-            
-            # Check if dependency succeeded
-            dep_result = self.results.get(dep_id)
-            if dep_result and dep_result.status != TaskStatus.SUCCESS:
+            if dep.status == TaskStatus.SUCCESS:
+                continue
+            if dep.status == TaskStatus.SKIPPED or (
+                    dep.status == TaskStatus.FAILED and dep.completed_at):
+                deps_failed = True
+                continue
+            degree += 1
+            self._dependents[dep_id].append(task.id)
+        
+        self._indegree[task.id] = degree
+        if degree == 0:
+            if deps_failed:
+                self._skip(task.id, "Dependencies failed")
                 if self.on_failure == "abort":
-                    self.aborted = True
-                    return False
-                # Skip this task if dependency failed
-                return False
+                    self._abort(task.id)
+            else:
+                self._push_ready(task.id)
+    
+    def _check_edge(self, task_id: str, dep_id: str):
+        """
+        Reject a new dependency that is unknown, would close a cycle or is on
+        a task already released. Changes nothing, so callers can check every
+        edge before adding any.
+        """
+        if task_id not in self.tasks or dep_id not in self.results:
+            raise KeyError(f"Unknown task in dependency {task_id} -> {dep_id}")
+        path = find_path(dep_id, task_id,
+                         lambda node: self.tasks[node].dependencies if node in self.tasks else ())
+        if path:
+            raise GraphError("Dependency cycle (task -> dependency): "
+                             + " -> ".join([task_id] + path))
+        if self.results[task_id].status != TaskStatus.PENDING or self._indegree.get(task_id, 0) == 0:
+            raise ValueError(f"Task {task_id} is already ready or finished; "
+                             f"it can no longer wait for {dep_id}")
+    
+    def _add_edge(self, task_id: str, dep_id: str):
+        """Add a dependency to a task that hasn't been released yet."""
+        self._check_edge(task_id, dep_id)
+        self.tasks[task_id].dependencies.append(dep_id)
+        dep = self.results[dep_id]
+        if dep.status in (TaskStatus.PENDING, TaskStatus.RUNNING) or (
+                dep.status == TaskStatus.FAILED and not dep.completed_at):
+            self._indegree[task_id] += 1
+            self._dependents[dep_id].append(task_id)
+        # Otherwise dep already finished; its outcome is checked when task_id is released
+    
+    def _add_dynamic_task(self, task: Task, required_by: List[str]):
+        """Register a task spawned by a running task."""
+        if task.id in self.tasks:
+            raise ValueError(f"Duplicate task id {task.id}")
+        self.add_task(task)
+        try:
+            for downstream_id in required_by:
+                self._check_edge(downstream_id, task.id)
+        except (KeyError, ValueError):  # Includes GraphError; nothing wired yet
+            del self.tasks[task.id], self.results[task.id]
+            raise
+        for downstream_id in required_by:
+            self._add_edge(downstream_id, task.id)
+        self._register(task)
+        self.dynamic_tasks += 1
+        self._notify()
+    
+    def _notify(self):
+        """Wake the scheduler loop so newly ready tasks are dispatched promptly."""
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+    
+    def _fingerprint(self, task: Task) -> Optional[str]:
+        """Args fingerprint shared by the journal and the result cache; None if args have none."""
+        if task.id in self._fingerprints:
+            return self._fingerprints[task.id]
+        try:
+            key = fingerprint(task.func, task.args, task.kwargs)
+        except (TypeError, ValueError, RecursionError) as e:
+            print(f"Warning: Task {task.id} can't be fingerprinted ({e}); "
+                  f"it will not be cached or journaled")
+            key = None
+        self._fingerprints[task.id] = key
+        return key
+    
+    def _cache_lookup(self, task: Task) -> bool:
+        """Complete a task from the result cache without running it."""
+        key = self._fingerprint(task)
+        if key is None:
+            return False
+        output = self.cache.get(key, task.cache)
+        if output is MISS:
+            return False
         
+        result = self.results[task.id]
+        result.status = TaskStatus.SUCCESS
+        result.output = output
+        result.completed_at = datetime.now().isoformat()
+        self.cache_hits += 1
+        self._record(task.id)
+        self._complete(task.id)
         return True
     
-    async def _execute_task(self, task: Task) -> TaskResult:
-        """Execute a single task with retry logic."""
+    def _restore_from_journal(self, task: Task) -> bool:
+        """Mark a task that already succeeded in a previous run as done."""
+        if not self._journal_records:
+            return False
+        key = self._fingerprint(task)
+        record = self._journal_records.get((task.id, key)) if key is not None else None
+        if record is None:
+            return False
+        
         result = self.results[task.id]
+        result.status = TaskStatus.SUCCESS
+        result.output = record["output"]
+        result.duration = record["duration"] or 0.0
+        result.started_at = record["started_at"]
+        result.completed_at = record["completed_at"]
+        result.attempts = record["attempts"] or 0
+        self.resumed += 1
+        return True
+    
+    def _record(self, task_id: str):
+        """Checkpoint a task's final result."""
+        if not self.journal:
+            return
+        key = self._fingerprint(self.tasks[task_id])
+        if key is None:
+            return  # Can't be matched on resume anyway
+        result = self.results[task_id]
+        self.journal.record(
+            task_id, key,
+            result.status.value, output=result.output, error=result.error,
+            duration=result.duration, started_at=result.started_at,
+            completed_at=result.completed_at, attempts=result.attempts
+        )
+    
+    def _sort_key(self, task: Task) -> tuple:
+        """Ready-queue ordering for the active scheduling policy (smallest first)."""
+        if self.scheduling == "critical_path":
+            rank = self._ranks.get(task.id)
+            if rank is None:
+                rank = self._ranks[task.id] = self.history.estimate(task.name)
+            return (-task.priority, -rank)
+        if self.scheduling == "edf":
+            deadline = self._deadlines.get(task.id)
+            if deadline is None:
+                deadline = deadline_timestamp(task.deadline)
+            return (-task.priority, deadline if deadline is not None else float("inf"))
+        return (-task.priority,)
+    
+    def _push_ready(self, task_id: str):
+        """Queue a task whose dependencies have all completed."""
+        task = self.tasks[task_id]
+        # Policy order first, then insertion order
+        heapq.heappush(self._ready, (self._sort_key(task), self._seq, task_id))
+        self._seq += 1
+        if task.deadline is not None:
+            self._flag_deadline_risk(task, time.time() + self.history.estimate(task.name), "ready")
+        if self.tracer:
+            self.tracer.ready(task_id)
+    
+    def _skip(self, task_id: str, reason: str):
+        """Mark a task skipped and release its dependents."""
+        result = self.results[task_id]
+        result.status = TaskStatus.SKIPPED
+        result.error = reason
+        self._complete(task_id)
+    
+    def _in_flight(self, task_id: str) -> bool:
+        result = self.results.get(task_id)
+        return result is not None and result.status in (TaskStatus.PENDING, TaskStatus.RUNNING)
+    
+    def _resolve_followers(self, leader_id: str) -> List[str]:
+        """Give a finished leader's outcome to the duplicate tasks that attached to it."""
+        leader = self.results[leader_id]
+        followers = self._followers.pop(leader_id)
+        for follower_id in followers:
+            result = self.results[follower_id]
+            result.status = leader.status
+            result.adopt_output(leader)
+            result.error = leader.error
+            result.duration = leader.duration
+            result.completed_at = leader.completed_at or datetime.now().isoformat()
+            self._record(follower_id)
+        return followers
+    
+    def _dep_succeeded(self, dep_id: str) -> bool:
+        dep = self.results.get(dep_id)
+        if dep is None:
+            return dep_id not in self._evicted_failures
+        return dep.status == TaskStatus.SUCCESS
+    
+    def _complete(self, task_id: str):
+        """
+        Mark a task finished and release its dependents.
         
-        # Wait for dependencies
-        deps_ok = await self._wait_for_dependencies(task)
-        if not deps_ok:
-            result.status = TaskStatus.SKIPPED
-            result.error = "Dependencies failed"
-            self.task_events[task.id].set()
-            return result
+        Dependents whose in-degree drops to zero are queued, or skipped (and
+        completed in turn) if any of their dependencies did not succeed.
+        """
+        stack = [task_id]
+        while stack:
+            done_id = stack.pop()
+            self._finished.append(done_id)
+            if done_id in self._own_deadlines:
+                self._check_deadline(done_id)
+            if self.metrics:
+                self.metrics.task_completed(self.results[done_id].status.value)
+            if self.output_store is not None:
+                self.results[done_id].spill(self.output_store)
+            dedup_key = self.tasks[done_id].dedup_key
+            if dedup_key and self._inflight.get(dedup_key) == done_id:
+                del self._inflight[dedup_key]  # Later twins must run, not attach to a finished leader
+            if done_id in self._followers:
+                stack.extend(self._resolve_followers(done_id))
+            self._unfinished -= 1
+            if self.tracer:
+                self.tracer.completed(done_id, self.results[done_id].status.value)
+            
+            for child_id in self._dependents.pop(done_id, ()):
+                self._indegree[child_id] -= 1
+                if self._indegree[child_id] > 0:
+                    continue
+                
+                child = self.tasks[child_id]
+                deps_ok = all(self._dep_succeeded(dep_id) for dep_id in child.dependencies)
+                if deps_ok:
+                    self._push_ready(child_id)
+                else:
+                    result = self.results[child_id]
+                    result.status = TaskStatus.SKIPPED
+                    result.error = "Orchestration aborted" if self.aborted else "Dependencies failed"
+                    if self.on_failure == "abort":
+                        self._abort(child_id)
+                    stack.append(child_id)
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the managed worker process pool."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._process_pool
+    
+    def _get_killable_pool(self) -> KillableWorkerPool:
+        """Lazily start the pool of killable single-job workers."""
+        if self._killable_pool is None:
+            self._killable_pool = KillableWorkerPool(self.max_workers)
+        return self._killable_pool
+    
+    def _get_broker_client(self) -> BrokerClient:
+        """Lazily open the coordinator's side of the broker queue."""
+        if self._broker_client is None:
+            if not self.broker:
+                raise ValueError("executor='broker' needs Orchestrator(broker='path/to/queue.db')")
+            self._broker_client = BrokerClient(self.broker, lease=self.broker_lease)
+        return self._broker_client
+    
+    def _shutdown_process_pool(self):
+        """Stop worker processes started during this run."""
+        if self._process_pool is not None:
+            # Don't block the loop on a timed-out job still running in the pool;
+            # it finishes in the background (use executor="killable" to stop it)
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._killable_pool is not None:
+            self.workers_killed = self._killable_pool.killed
+            self._killable_pool.shutdown()
+            self._killable_pool = None
+        if self._broker_client is not None:
+            self.broker_stats = self._broker_client.snapshot()
+            self._broker_client.shutdown()
+            self._broker_client = None
+    
+    async def _pickle_job(self, task: Task) -> Optional[bytes]:
+        """
+        Serialize a task for a worker process, once and off the event loop.
+        Returns None (and remembers it, so retries skip the attempt) if it can't be pickled.
+        """
+        job = (task.func, task.args, task.kwargs)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(pickle.dumps, job, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            self._unpicklable.add(task.id)
+            print(f"Warning: Task {task.id} is not picklable, running in thread pool instead")
+            return None
+    
+    def _resolve_executor(self, task: Task) -> str:
+        """Pick the backend for a task, falling back to threads if it can't be pickled."""
+        executor = task.executor or self.executor
+        if executor not in EXECUTORS:
+            raise ValueError(f"Task {task.id}: executor must be one of {EXECUTORS}, got {executor!r}")
         
-        # Check if aborted
-        if self.aborted:
-            result.status = TaskStatus.SKIPPED
-            result.error = "Orchestration aborted"
-            self.task_events[task.id].set()
-            return result
-        
-        # Execute with semaphore
-        async with self.semaphore:
-            result.status = TaskStatus.RUNNING
+        if task.context and executor in ("process", "killable", "broker"):
+            print(f"Warning: Task {task.id} needs a TaskContext, running in thread pool instead")
+            return "thread"
+        if executor in ("process", "killable", "broker") and task.id in self._unpicklable:
+            return "thread"
+        return executor
+    
+    async def _call(self, task: Task, executor: str) -> Any:
+        """Run a task's func once on the selected backend."""
+        kwargs = task.kwargs
+        if task.context:
+            kwargs = {**kwargs, "ctx": TaskContext(self, task.id, asyncio.get_running_loop())}
+        
+        payload = None
+        if executor == "broker" or (executor in ("process", "killable")
+                                    and not asyncio.iscoroutinefunction(task.func)):
+            payload = await self._pickle_job(task)
+            if payload is None:
+                executor = "thread"
+        
+        if executor == "broker":
+            # Async funcs run remotely too; the worker drives them with asyncio.run
+            return await asyncio.wait_for(
+                self._get_broker_client().run(task.id, call_pickled, (payload,)),
+                timeout=task.timeout
+            )
+        
+        if asyncio.iscoroutinefunction(task.func):
+            return await asyncio.wait_for(
+                task.func(*task.args, **kwargs),
+                timeout=task.timeout
+            )
+        
+        if executor == "inline":
+            return task.func(*task.args, **kwargs)
+        
+        if executor == "killable":
+            # Times out by killing the worker process, not by abandoning a thread
+            return await self._get_killable_pool().run(
+                call_pickled, (payload,), timeout=task.timeout
+            )
+        
+        if executor == "process":
+            pool = self._get_process_pool()
+            call = functools.partial(call_pickled, payload)
+        else:
+            pool = None
+            call = functools.partial(task.func, *task.args, **kwargs)
+        return await asyncio.wait_for(
+            asyncio.get_running_loop().run_in_executor(pool, call),
+            timeout=task.timeout
+        )
+    
+    async def _execute_task(self, task: Task) -> TaskResult:
+        """Execute a single attempt of a task; retries are scheduled by the caller."""
+        result = self.results[task.id]
+        result.status = TaskStatus.RUNNING
+        result.attempts += 1
+        if result.started_at is None:
             result.started_at = datetime.now().isoformat()
+        executor = self._resolve_executor(task)
+        if self.tracer:
+            self.tracer.attempt_started(task.id)
+        
+        try:
+            start_time = time.time()
+            output = await self._call(task, executor)
             
-            last_error = None
-            for attempt in range(task.retries):
-                try:
-                    start_time = time.time()
-                    
-                    # Execute task (handle both sync and async)
-                    if asyncio.iscoroutinefunction(task.func):
-                        output = await asyncio.wait_for(
-                            task.func(*task.args, **task.kwargs),
-                            timeout=task.timeout
-                        )
-                    else:
-                        output = await asyncio.wait_for(
-                            asyncio.get_event_loop().run_in_executor(
-                                None, lambda: task.func(*task.args, **task.kwargs)
-                            ),
-                            timeout=task.timeout
-                        )
-                    
-                    result.status = TaskStatus.SUCCESS
-                    result.output = output
-                    result.duration = time.time() - start_time
-                    result.completed_at = datetime.now().isoformat()
-                    break
-                    
-                except asyncio.TimeoutError:
-                    last_error = f"Timeout after {task.timeout}s"
-                except Exception as e:
-                    last_error = f"{type(e).__name__}: {str(e)}"
-                    traceback.print_exc()
-                
-                if attempt < task.retries - 1:
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+            result.status = TaskStatus.SUCCESS
+            result.output = output
+            result.error = None
+            result.duration = time.time() - start_time
+            result.completed_at = datetime.now().isoformat()
             
-            if result.status != TaskStatus.SUCCESS:
+        except asyncio.TimeoutError:
+            result.status = TaskStatus.FAILED
+            result.error = f"Timeout after {task.timeout}s"
+            result.duration = time.time() - start_time
+        except Exception as e:
+            result.status = TaskStatus.FAILED
+            result.error = f"{type(e).__name__}: {str(e)}"
+            result.duration = time.time() - start_time
+            traceback.print_exc()
+        finally:
+            if self.tracer:
+                self.tracer.attempt_finished(task.id, result.status.value)
+        
+        return result
+    
+    def _backoff_delay(self, attempts: int) -> float:
+        """Exponential backoff with full jitter."""
+        ceiling = min(self.max_backoff, self.retry_backoff * 2 ** (attempts - 1))
+        return random.uniform(0, ceiling)
+    
+    def _should_retry(self, task: Task, result: TaskResult) -> bool:
+        """Decide whether a failed attempt gets another try."""
+        if self.aborted or result.attempts >= task.retries:
+            return False
+        if self.retry_budget is not None and self.retries_used >= self.retry_budget:
+            self.retry_budget_exhausted = True
+            return False
+        return True
+    
+    def _call_later(self, delay: float, task_id: Optional[str], callback: Callable, *args):
+        """
+        Run `callback` on the loop after `delay` and wake the scheduler. Timers
+        are loop callbacks, not futures, so waiting for progress costs the same
+        however many retries are backing off.
+        """
+        def fire():
+            del self._delayed[handle]
+            callback(*args)
+            self._notify()
+        
+        handle = asyncio.get_running_loop().call_later(delay, fire)
+        self._delayed[handle] = task_id
+    
+    def _on_task_done(self, task_id: str):
+        """Handle a finished attempt: retry it, or finalize and release dependents."""
+        result = self.results[task_id]
+        if self.aimd:
+            self.aimd.observe(result.duration, result.status == TaskStatus.SUCCESS)
+        if self.metrics:
+            self.metrics.attempt_finished(result.duration)
+        
+        if result.status == TaskStatus.FAILED:
+            task = self.tasks[task_id]
+            if self._should_retry(task, result):
+                self.retries_used += 1
+                result.status = TaskStatus.PENDING
+                # Sleep off the backoff without holding a slot, then re-enqueue
+                self._call_later(self._backoff_delay(result.attempts), task_id,
+                                 self._push_ready, task_id)
+                return
+            
+            result.completed_at = datetime.now().isoformat()
+            if self.on_failure == "abort":
+                self._abort(task_id)
+        
+        elif result.status == TaskStatus.SUCCESS:
+            task = self.tasks[task_id]
+            if self.scheduling in ("critical_path", "edf") or self.history.path:
+                self.history.update(task.name, result.duration)
+            if task.cache:
+                key = self._fingerprint(task)
+                if key is not None:
+                    self.cache.set(key, result.output, task.cache)
+        
+        self._record(task_id)
+        self._complete(task_id)
+    
+    def _park(self, entry: tuple, tag: str, now: float):
+        """Hold a ready task until `tag` can admit it."""
+        heapq.heappush(self._parked[tag], entry)
+        
+        wait = self.resources.rate_wait(tag, now)
+        if wait is not None and tag not in self._wake_pending:
+            self._wake_pending.add(tag)
+            self._call_later(wait, None, self._wake, tag)
+    
+    def _wake(self, tag: str):
+        """Re-check rate-limited tasks once the tag's bucket has refilled."""
+        self._wake_pending.discard(tag)
+        self._unpark(tag)
+    
+    def _unpark(self, tag: str):
+        """Move parked tasks back to the ready queue as `tag` frees up."""
+        parked = self._parked.get(tag)
+        now = time.monotonic()
+        budget = self.resources.headroom(tag, now)
+        
+        while parked and budget >= 1:
+            entry = heapq.heappop(parked)
+            task = self.tasks[entry[2]]
+            other = self.resources.blocked_by(task.resources, now)
+            if other is not None and other != tag:
+                self._park(entry, other, now)  # Wait on the tag that actually blocks it
+                continue
+            heapq.heappush(self._ready, entry)
+            budget -= 1
+        
+        if parked:
+            wait = self.resources.rate_wait(tag, now)
+            if wait is not None and tag not in self._wake_pending:
+                self._wake_pending.add(tag)
+                self._call_later(wait, None, self._wake, tag)
+        elif tag in self._parked:
+            del self._parked[tag]
+    
+    def _release_resources(self, task: Task):
+        """Give back a finished attempt's resource slots."""
+        if task.resources:
+            self.resources.release(task.resources)
+            for tag in task.resources:
+                self._unpark(tag)
+    
+    @property
+    def concurrency_limit(self) -> int:
+        """Current cap on running tasks (moves over time in adaptive mode)."""
+        return self.aimd.limit if self.aimd else self.max_concurrent
+    
+    def _dispatch(self):
+        """Launch ready tasks until the concurrency limit is reached."""
+        while self._ready and len(self._running) < self.concurrency_limit:
+            entry = heapq.heappop(self._ready)
+            task_id = entry[2]
+            
+            if self.aborted:
+                self._skip(task_id, "Orchestration aborted")
+                continue
+            
+            task = self.tasks[task_id]
+            if task.cache and self._cache_lookup(task):
+                continue
+            
+            if task.dedup_key:
+                leader_id = self._inflight.get(task.dedup_key)
+                if (leader_id is not None and leader_id != task_id
+                        and self._in_flight(leader_id)):
+                    # Attach to the in-flight twin instead of running again
+                    self._followers.setdefault(leader_id, []).append(task_id)
+                    self.results[task_id].status = TaskStatus.RUNNING
+                    self.results[task_id].started_at = datetime.now().isoformat()
+                    self.coalesced += 1
+                    continue
+            
+            if task.resources:
+                now = time.monotonic()
+                blocked = self.resources.blocked_by(task.resources, now)
+                if blocked is not None:
+                    self._park(entry, blocked, now)
+                    continue
+                self.resources.acquire(task.resources, now)
+            
+            if task.dedup_key:
+                self._inflight[task.dedup_key] = task_id
+            
+            if self.tracer:
+                self.tracer.slot_acquired(task_id)
+            future = asyncio.ensure_future(self._execute_task(task))
+            self._running[future] = task_id
+    
+    async def _wait_for_progress(self):
+        """Wait until an attempt finishes, a backoff elapses or a task is added mid-run."""
+        wakeup = self._wakeup
+        done, _ = await asyncio.wait([*self._running, wakeup], return_when=asyncio.FIRST_COMPLETED)
+        if wakeup.done():
+            # Replaced only once seen, so a notify between waits isn't lost
+            self._wakeup = asyncio.get_running_loop().create_future()
+            done.discard(wakeup)
+        for future in done:
+            task_id = self._running.pop(future)
+            self._release_resources(self.tasks[task_id])
+            if future.cancelled():
+                self._cancel_result(task_id)
+                self._complete(task_id)
+            elif future.exception() is not None:
+                result = self.results[task_id]
                 result.status = TaskStatus.FAILED
-                result.error = last_error
+                result.error = f"{type(future.exception()).__name__}: {future.exception()}"
                 result.completed_at = datetime.now().isoformat()
-                
-                if self.on_failure == "abort":
-                    self.aborted = True
+                self._complete(task_id)
+            else:
+                self._on_task_done(task_id)
+    
+    def _cancel_result(self, task_id: str):
+        result = self.results[task_id]
+        result.status = TaskStatus.CANCELLED
+        result.error = "Cancelled by abort"
+        result.completed_at = datetime.now().isoformat()
+    
+    def _abort(self, trigger_id: str):
+        """
+        Fail fast: cancel running attempts and pending retries, drain the
+        executors and skip everything that never started.
+        """
+        if self.aborted:
+            return
+        self.aborted = True
+        cancelled = []
         
-        # Signal completion
-        self.task_events[task.id].set()
-        return result
+        # Running attempts finish as CANCELLED once their futures report back
+        for future, task_id in self._running.items():
+            if future.cancel():
+                cancelled.append(task_id)
+        
+        for timer, task_id in list(self._delayed.items()):
+            timer.cancel()
+            del self._delayed[timer]
+            if task_id is not None:
+                self._cancel_result(task_id)
+                cancelled.append(task_id)
+                self._complete(task_id)
+        self._wake_pending.clear()
+        
+        queued = self._ready + [entry for parked in self._parked.values() for entry in parked]
+        self._ready, self._parked = [], defaultdict(list)
+        for entry in sorted(queued):
+            task_id = entry[2]
+            if self.results[task_id].attempts:
+                self._cancel_result(task_id)
+                cancelled.append(task_id)
+                self._complete(task_id)
+            else:
+                self._skip(task_id, "Orchestration aborted")
+        
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        
+        self.abort_info = {
+            "trigger": trigger_id,
+            "error": self.results[trigger_id].error,
+            "cancelled": cancelled,
+            "never_started": [],  # Filled in when the run winds down
+        }
     
-    async def run(self) -> Dict[str, TaskResult]:
-        """Run all tasks with dependency resolution."""
+    async def _feed(self, source, window: int, room: asyncio.Event):
+        """
+        Admit tasks from a lazy source, keeping at most `window` unfinished.
+        Runs beside the scheduler loop so a slow source never delays dispatch
+        of tasks that are already ready; `room` is set when tasks finish.
+        """
+        try:
+            while True:
+                while self._unfinished >= window:
+                    room.clear()
+                    await room.wait()
+                try:
+                    task = await source.__anext__()
+                except StopAsyncIteration:
+                    return
+                if self.aborted:
+                    return
+                self.add_task(task)
+                self._register(task)
+                self._notify()
+        finally:
+            self._notify()  # Let the scheduler see the source is done
+    
+    def _evict(self, task_id: str):
+        """Drop a yielded task's bookkeeping, remembering only its outcome for dependents."""
+        result = self.results.pop(task_id)
+        self.tasks.pop(task_id, None)
+        self._fingerprints.pop(task_id, None)
+        self._indegree.pop(task_id, None)
+        self._evicted[result.status] += 1
+        if result.status == TaskStatus.SUCCESS:
+            self._evicted_ok.add(task_id)
+        else:
+            self._evicted_failures.add(task_id)
+    
+    async def stream(self, source=None, window: Optional[int] = None,
+                     retain_results: bool = True):
+        """
+        Run tasks and yield each TaskResult as soon as it completes.
+        
+        source: optional iterable or async iterable of Tasks, pulled lazily so
+                at most `window` (default twice the concurrency cap) are admitted but
+                unfinished at a time. Tasks may depend on earlier-fed tasks.
+        retain_results: False drops each task and its result once yielded,
+                keeping memory bounded for very large sources.
+        """
+        # Fail before anything runs rather than leaving part of the graph stuck;
+        # checked before the journal and output store are opened so nothing leaks
+        self.validate().raise_for_errors()
         self.started_at = datetime.now()
+        self.completed_at = None
         self.aborted = False
+        self.abort_info = None
+        self._reset_run_state()
+        self._wakeup = asyncio.get_running_loop().create_future()
+        if self.metrics:
+            self.metrics.start(self, asyncio.get_running_loop())
+        self._build_graph()
         
-        # Sort tasks by priority (higher first)
-        sorted_tasks = sorted(
-            self.tasks.values(),
-            key=lambda t: t.priority,
-            reverse=True
-        )
-        
-        # Create all task coroutines
-        coroutines = [self._execute_task(task) for task in sorted_tasks]
+        window = window or 2 * (self.concurrency_bounds[1] if self.adaptive else self.max_concurrent)
+        room = asyncio.Event()
+        feeder = None
+        if source is not None:
+            feeder = asyncio.ensure_future(self._feed(_aiter(source), window, room))
         
-        # Run all tasks concurrently
-        await asyncio.gather(*coroutines, return_exceptions=True)
+        try:
+            while True:
+                if feeder is not None and self.aborted:
+                    feeder.cancel()
+                    feeder = None
+                elif feeder is not None and feeder.done():
+                    feeder.result()  # Re-raise an error from the source
+                    feeder = None
+                if self._unfinished < window:
+                    room.set()
+                self._dispatch()
+                
+                while self._finished:
+                    task_id = self._finished.popleft()
+                    result = self.results[task_id]
+                    if not retain_results:
+                        self._evict(task_id)
+                    yield result
+                
+                if not (self._running or self._delayed):
+                    if feeder is None or self._unfinished >= window:
+                        break  # Anything left waits on a task that will never be fed
+                
+                await self._wait_for_progress()
+            
+            # Anything never released was aborted or is stuck behind a dependency cycle
+            for result in list(self.results.values()):
+                if result.status == TaskStatus.PENDING:
+                    result.status = TaskStatus.SKIPPED
+                    result.error = ("Orchestration aborted" if self.aborted
+                                    else "Unresolvable dependencies (cycle)")
+                    yield result
+        finally:
+            if feeder is not None:
+                feeder.cancel()
+            for future in self._running:
+                future.cancel()
+            for timer in self._delayed:
+                timer.cancel()
+            if self._wakeup is not None:
+                self._wakeup.cancel()
+                self._wakeup = None
+            self._shutdown_process_pool()
+            if self.journal:
+                self.journal.close()
+            self.history.save()
+            if self.metrics:
+                self.metrics.stop()
+            if self.abort_info:
+                self.abort_info["never_started"] = [
+                    r.task_id for r in self.results.values()
+                    if r.status == TaskStatus.SKIPPED and r.error == "Orchestration aborted"
+                ]
+            self.completed_at = datetime.now()
+    
+    async def run(self) -> Dict[str, TaskResult]:
+        """
+        Run all tasks with dependency resolution.
         
-        self.completed_at = datetime.now()
+        Uses a ready queue: in-degrees are computed once, and only tasks whose
+        dependencies are satisfied are launched, up to max_concurrent at a time.
+        """
+        async for _ in self.stream():
+            pass
         return self.results
     
+    def critical_path(self) -> Dict:
+        """Critical path of the last traced run with per-step time breakdown."""
+        if not self.tracer:
+            raise RuntimeError("Tracing is off; create the Orchestrator with trace=True")
+        return self.tracer.critical_path(
+            {task_id: task.dependencies for task_id, task in self.tasks.items()}
+        )
+    
+    def export_trace(self, path: str):
+        """Write the last traced run as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        if not self.tracer:
+            raise RuntimeError("Tracing is off; create the Orchestrator with trace=True")
+        self.tracer.export_chrome_trace(path)
+    
     def get_summary(self) -> Dict:
         """Get execution summary."""
         success = sum(1 for r in self.results.values() 
-                     if r.status == TaskStatus.SUCCESS)
+                     if r.status == TaskStatus.SUCCESS) + self._evicted[TaskStatus.SUCCESS]
         failed = sum(1 for r in self.results.values() 
-                    if r.status == TaskStatus.FAILED)
+                    if r.status == TaskStatus.FAILED) + self._evicted[TaskStatus.FAILED]
         skipped = sum(1 for r in self.results.values() 
-                     if r.status == TaskStatus.SKIPPED)
+                     if r.status == TaskStatus.SKIPPED) + self._evicted[TaskStatus.SKIPPED]
+        cancelled = sum(1 for r in self.results.values() 
+                       if r.status == TaskStatus.CANCELLED) + self._evicted[TaskStatus.CANCELLED]
+        total = len(self.results) + sum(self._evicted.values())
         
         duration = None
         if self.started_at and self.completed_at:
             duration = (self.completed_at - self.started_at).total_seconds()
         
         return {
-            "total": len(self.results),
+            "total": total,
             "success": success,
             "failed": failed,
             "skipped": skipped,
-            "success_rate": f"{(success / len(self.results) * 100):.1f}%" if self.results else "0%",
+            "cancelled": cancelled,
+            "success_rate": f"{(success / total * 100):.1f}%" if total else "0%",
             "duration_seconds": duration,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "aborted": self.aborted,
-            "max_concurrent": self.max_concurrent
+            "abort": self.abort_info,
+            "max_concurrent": self.max_concurrent,
+            "scheduling": self.scheduling,
+            "deadlines": self._deadline_summary(),
+            "adaptive": self.aimd.snapshot() if self.aimd else None,
+            "executor": self.executor,
+            "workers_killed": self.workers_killed,
+            "broker": self.broker_stats,
+            "retries": self.retries_used,
+            "retry_budget": self.retry_budget,
+            "retry_budget_exhausted": self.retry_budget_exhausted,
+            "resumed": self.resumed,
+            "dynamic_tasks": self.dynamic_tasks,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "resources": self.resources.snapshot(),
+            "critical_path": self._critical_path_summary(),
+            "spilled": self.output_store.stats() if self.output_store else None
         }
     
-    def get_results(self) -> Dict[str, Dict]:
-        """Get all results as dict."""
+    def _deadline_summary(self) -> Optional[Dict]:
+        if not self._own_deadlines:
+            return None
+        return {
+            "tasks": len(self._own_deadlines),
+            "met": self._deadlines_met,
+            "missed": list(self.deadline_misses),
+            "at_risk": dict(self.deadline_risks),
+        }
+    
+    def _critical_path_summary(self) -> Optional[Dict]:
+        if not self.tracer:
+            return None
+        path = self.critical_path()
         return {
-            task_id: {
-                "task_id": r.task_id,
-                "status": r.status.value,
-                "output": r.output,
-                "error": r.error,
-                "duration": r.duration,
-                "started_at": r.started_at,
-                "completed_at": r.completed_at
-            }
-            for task_id, r in self.results.items()
+            "makespan": path["makespan"],
+            "tasks": [step["task_id"] for step in path["path"]],
+            "totals": path.get("totals", {}),
         }
     
+    def get_results(self) -> Dict[str, Dict]:
+        """Get all results as dict (loads every spilled output; see iter_results)."""
+        return dict(self.iter_results())
+    
+    def iter_results(self):
+        """Yield (task_id, result dict) one at a time, loading spilled outputs lazily."""
+        for task_id, result in self.results.items():
+            yield task_id, result.to_dict()
+    
+    def export_jsonl(self, path: str) -> int:
+        """
+        Stream retained results to a JSON Lines file, one task per line.
+        Outputs that aren't JSON-serializable are written as their repr.
+        """
+        count = 0
+        with open(path, "w") as f:
+            for _, record in self.iter_results():
+                f.write(json.dumps(record, default=repr))
+                f.write("\n")
+                count += 1
+        return count
+    
     def print_report(self):
         """Print execution report."""
         summary = self.get_summary()
@@ -240,11 +1405,43 @@ class Orchestrator:
         print(f"Success:        {summary['success']} ({summary['success_rate']})")
         print(f"Failed:         {summary['failed']}")
         print(f"Skipped:        {summary['skipped']}")
+        if summary['cancelled']:
+            print(f"Cancelled:      {summary['cancelled']}")
         print(f"Duration:       {summary['duration_seconds']:.2f}s")
         print(f"Max Concurrent: {summary['max_concurrent']}")
+        if summary['adaptive']:
+            adaptive = summary['adaptive']
+            print(f"Adaptive Limit: {adaptive['limit']} "
+                  f"(+{adaptive['increases']} / -{adaptive['decreases']} adjustments)")
+        if summary['deadlines']:
+            d = summary['deadlines']
+            print(f"Deadlines:      {d['met']}/{d['tasks']} met, {len(d['missed'])} missed, "
+                  f"{len(d['at_risk'])} flagged at risk")
+        if summary['coalesced']:
+            print(f"Coalesced:      {summary['coalesced']} (single-flight)")
+        if summary['cache_hits']:
+            print(f"Cache Hits:     {summary['cache_hits']}")
+        if summary['resumed']:
+            print(f"Resumed:        {summary['resumed']} (from journal)")
+        print(f"Retries:        {summary['retries']}"
+              + (" (budget exhausted)" if summary['retry_budget_exhausted'] else ""))
+        
+        if summary['critical_path']:
+            path = summary['critical_path']
+            print(f"Critical Path:  {' → '.join(path['tasks'][:8])}"
+                  + (" …" if len(path['tasks']) > 8 else ""))
+            print(f"                {path['makespan']:.2f}s makespan; "
+                  + ", ".join(f"{k} {v:.2f}s" for k, v in path['totals'].items()))
         
         if self.aborted:
             print("\n⚠️  ABORTED due to failure")
+            if self.abort_info:
+                info = self.abort_info
+                print(f"  Trigger:       {info['trigger']}: {info['error']}")
+                for label, ids in (("Cancelled", info['cancelled']),
+                                   ("Never started", info['never_started'])):
+                    shown = ", ".join(ids[:10]) + (f" (+{len(ids) - 10} more)" if len(ids) > 10 else "")
+                    print(f"  {label + ':':<14} {len(ids)}" + (f" - {shown}" if ids else ""))
         
         # Print failed tasks
         failed_tasks = [r for r in self.results.values() 
@@ -259,10 +1456,34 @@ class Orchestrator:
 
 # Convenience functions for common patterns
 
+async def _aiter(iterable):
+    """Iterate a sync or async iterable asynchronously."""
+    if hasattr(iterable, "__aiter__"):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+def _default_concurrency(executor: str) -> int:
+    """Process pools should keep every core busy; I/O-bound work defaults to 5."""
+    return (os.cpu_count() or 1) if executor == "process" else 5
+
+
 async def parallel_map(func: Callable, items: List[Any], 
-                       max_concurrent: int = 5) -> List[Any]:
-    """Map a function over items in parallel."""
-    orch = Orchestrator(max_concurrent=max_concurrent)
+                       max_concurrent: Optional[int] = None,
+                       executor: str = "thread",
+                       journal: Optional[str] = None) -> List[Any]:
+    """
+    Map a function over items in parallel.
+    
+    Use executor="process" for CPU-bound sync functions (image optimization,
+    font subsetting, HTML parsing) to spread work across all cores.
+    """
+    max_concurrent = max_concurrent or _default_concurrency(executor)
+    orch = Orchestrator(max_concurrent=max_concurrent, executor=executor,
+                        journal=journal)
     
     for i, item in enumerate(items):
         orch.add_task(Task(
@@ -278,19 +1499,70 @@ async def parallel_map(func: Callable, items: List[Any],
     return [orch.results[f"item_{i}"].output for i in range(len(items))]
 
 
+async def parallel_map_stream(func: Callable, items, 
+                              max_concurrent: Optional[int] = None,
+                              executor: str = "thread",
+                              window: Optional[int] = None):
+    """
+    Map a function over a (possibly huge or async) iterable with backpressure.
+    
+    Yields (index, output) pairs in completion order. Items are pulled from
+    `items` only as slots free up, so memory stays bounded by `window`
+    rather than by the number of items.
+    """
+    max_concurrent = max_concurrent or _default_concurrency(executor)
+    orch = Orchestrator(max_concurrent=max_concurrent, executor=executor)
+    
+    async def tasks():
+        i = 0
+        async for item in _aiter(items):
+            yield Task(id=f"item_{i}", name=f"Process item {i}", func=func, args=(item,))
+            i += 1
+    
+    async for result in orch.stream(tasks(), window=window, retain_results=False):
+        yield int(result.task_id.rsplit("_", 1)[1]), result.output
+
+
 async def parallel_batch(tasks: List[Dict], 
-                        max_concurrent: int = 5,
-                        on_failure: str = "continue") -> Dict:
+                        max_concurrent: Optional[int] = None,
+                        on_failure: str = "continue",
+                        executor: str = "thread",
+                        retry_budget: Optional[int] = None,
+                        journal: Optional[str] = None,
+                        resource_limits: Optional[Dict[str, int]] = None,
+                        rate_limits: Optional[Dict[str, float]] = None,
+                        adaptive: bool = False,
+                        scheduling: str = "priority",
+                        history: Optional[str] = None) -> Dict:
     """
     Run a batch of tasks in parallel.
     
+    Pass journal="path/run.db" to checkpoint results; rerunning the same batch
+    with the same journal skips tasks that already succeeded.
+    
     tasks format:
     [
         {"id": "task1", "func": some_func, "args": (arg1, arg2)},
         {"id": "task2", "func": other_func, "kwargs": {"key": "value"}},
+        {"id": "task3", "func": cpu_func, "executor": "process"},
+        {"id": "task3b", "func": flaky_http_call, "executor": "killable", "timeout": 30},
+        {"id": "task4", "func": audit_url, "args": (url,), "cache": CachePolicy(ttl=86400)},
+        {"id": "task5", "func": steel_scrape, "resources": ["steel", "wp:smarthomewizards.com"]},
+        {"id": "task6", "func": wp_login, "args": (site,), "dedup_key": f"login:{site}"},
     ]
+    
+    resource_limits caps concurrent tasks per tag, e.g. {"steel": 3};
+    rate_limits caps starts per second per tag, e.g. {"anthropic": 2.0}.
+    adaptive=True treats max_concurrent as a starting point and tunes it (AIMD).
+    scheduling="critical_path" starts the ready task with the longest downstream
+    chain first, using durations remembered per task name in `history` (JSON).
     """
-    orch = Orchestrator(max_concurrent=max_concurrent, on_failure=on_failure)
+    max_concurrent = max_concurrent or _default_concurrency(executor)
+    orch = Orchestrator(max_concurrent=max_concurrent, on_failure=on_failure,
+                        executor=executor, retry_budget=retry_budget,
+                        journal=journal, resource_limits=resource_limits,
+                        rate_limits=rate_limits, adaptive=adaptive,
+                        scheduling=scheduling, history=history)
     
     for t in tasks:
         orch.add_task(Task(
@@ -302,7 +1574,12 @@ async def parallel_batch(tasks: List[Dict],
             dependencies=t.get("dependencies", []),
             timeout=t.get("timeout", 300),
             retries=t.get("retries", 3),
-            priority=t.get("priority", 0)
+            priority=t.get("priority", 0),
+            executor=t.get("executor"),
+            cache=t.get("cache"),
+            resources=t.get("resources", []),
+            dedup_key=t.get("dedup_key"),
+            deadline=t.get("deadline")
         ))
     
     await orch.run()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Resource Limits.
+Per-tag concurrency caps and token-bucket rate limits for orchestrator tasks.
+"""
+
+import time
+from typing import Dict, Iterable, Optional
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/sec, holding at most `burst` tokens."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.tokens
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one whole token is available."""
+        self._refill(now)
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+
+class ResourcePool:
+    """
+    Tracks in-use counts and rate buckets for resource tags such as
+    "steel", "anthropic" or "wp:smarthomewizards.com". Tags without a
+    configured limit are unconstrained.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None,
+                 rates: Optional[Dict[str, float]] = None):
+        self.limits = dict(limits or {})
+        self.buckets = {tag: TokenBucket(rate) for tag, rate in (rates or {}).items()}
+        self.in_use: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+
+    def headroom(self, tag: str, now: float) -> float:
+        """How many more tasks could start on this tag right now."""
+        free = float("inf")
+        if tag in self.limits:
+            free = self.limits[tag] - self.in_use.get(tag, 0)
+        if tag in self.buckets:
+            free = min(free, int(self.buckets[tag].available(now)))
+        return free
+
+    def blocked_by(self, tags: Iterable[str], now: float) -> Optional[str]:
+        """Return the first tag that can't admit another task, or None."""
+        for tag in tags:
+            if self.headroom(tag, now) < 1:
+                return tag
+        return None
+
+    def rate_wait(self, tag: str, now: float) -> Optional[float]:
+        """Seconds until the tag's bucket refills, if it is the bucket that blocks."""
+        if tag in self.limits and self.in_use.get(tag, 0) >= self.limits[tag]:
+            return None  # Waiting on a release, not on time
+        bucket = self.buckets.get(tag)
+        return bucket.wait_time(now) if bucket else None
+
+    def acquire(self, tags: Iterable[str], now: float):
+        for tag in tags:
+            count = self.in_use.get(tag, 0) + 1
+            self.in_use[tag] = count
+            self.peak[tag] = max(self.peak.get(tag, 0), count)
+            if tag in self.buckets:
+                self.buckets[tag].take(now)
+
+    def release(self, tags: Iterable[str]):
+        for tag in tags:
+            self.in_use[tag] -= 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-tag limits and usage for reporting."""
+        tags = set(self.limits) | set(self.buckets) | set(self.in_use)
+        return {
+            tag: {
+                "limit": self.limits.get(tag),
+                "rate_per_sec": self.buckets[tag].rate if tag in self.buckets else None,
+                "in_use": self.in_use.get(tag, 0),
+                "peak": self.peak.get(tag, 0),
+            }
+            for tag in sorted(tags)
+        }
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Result Cache.
+Two-tier memoization for orchestrator tasks: in-memory LRU plus a pickle-on-disk tier with TTL.
+"""
+
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+MISS = object()
+
+
+@dataclass
+class CachePolicy:
+    ttl: Optional[float] = 3600.0  # Seconds; None = never expires
+    memory: bool = True
+    disk: bool = True
+
+
+class ResultCache:
+    """LRU memory cache backed by a content-addressed disk directory."""
+
+    def __init__(self, cache_dir: str = ".orchestrator-cache", max_entries: int = 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def _remember(self, key: str, expires_at: Optional[float], value: Any):
+        self.memory[key] = (expires_at, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str, policy: CachePolicy) -> Any:
+        """Return the cached value for key, or MISS."""
+        now = time.time()
+
+        if policy.memory and key in self.memory:
+            expires_at, value = self.memory[key]
+            if expires_at is None or expires_at > now:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+            del self.memory[key]
+
+        if policy.disk:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    expires_at, value = pickle.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                path.unlink(missing_ok=True)  # Corrupt or stale format
+            else:
+                if expires_at is None or expires_at > now:
+                    if policy.memory:
+                        self._remember(key, expires_at, value)
+                    self.stats["disk_hits"] += 1
+                    return value
+                path.unlink(missing_ok=True)
+
+        self.stats["misses"] += 1
+        return MISS
+
+    def set(self, key: str, value: Any, policy: CachePolicy):
+        """Store value under key in the tiers enabled by policy."""
+        expires_at = time.time() + policy.ttl if policy.ttl is not None else None
+
+        if policy.memory:
+            self._remember(key, expires_at, value)
+
+        if policy.disk:
+            try:
+                data = pickle.dumps((expires_at, value), protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                return  # Output can't be persisted; memory tier still applies
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        self.stats["writes"] += 1
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Result Store.
+Append-only on-disk store for large task outputs, read back lazily by offset.
+"""
+
+import os
+import pickle
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+# Outputs of these types are never worth measuring, let alone spilling
+_SMALL_TYPES = (type(None), bool, int, float, complex)
+
+
+def _discard(file, path: Path):
+    file.close()
+    if path.exists():
+        path.unlink()
+
+
+class OutputStore:
+    """
+    One pickle file per run. Outputs whose pickled size reaches `threshold`
+    bytes are appended to it and replaced in memory by an (offset, length) pair.
+    """
+
+    def __init__(self, directory: str = ".orchestrator-spill", threshold: int = 64 * 1024):
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.path = self.directory / f"outputs-{os.getpid()}-{uuid.uuid4().hex[:8]}.bin"
+        self._file = None
+        self._finalizer = None
+        self._lock = threading.Lock()  # Outputs may be read from worker threads
+        self._end = 0
+        self.spilled = 0
+        self.bytes_written = 0
+
+    def put(self, value: Any) -> Optional[Tuple[int, int]]:
+        """Write value if it is large enough; returns its (offset, length) or None."""
+        if isinstance(value, _SMALL_TYPES):
+            return None
+        if isinstance(value, (str, bytes, bytearray)) and len(value) < self.threshold:
+            return None
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None  # Unpicklable outputs simply stay in memory
+        if len(blob) < self.threshold:
+            return None
+
+        with self._lock:
+            if self._file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "w+b")
+                # Remove the file once no result references the store (or at exit)
+                self._finalizer = weakref.finalize(self, _discard, self._file, self.path)
+            offset = self._end
+            self._file.seek(offset)
+            self._file.write(blob)
+            self._end += len(blob)
+        self.spilled += 1
+        self.bytes_written += len(blob)
+        return offset, len(blob)
+
+    def get(self, offset: int, length: int) -> Any:
+        with self._lock:
+            self._file.flush()
+            self._file.seek(offset)
+            blob = self._file.read(length)
+        return pickle.loads(blob)
+
+    def stats(self) -> dict:
+        return {"outputs": self.spilled, "bytes": self.bytes_written, "path": str(self.path)}
+
+    def close(self):
+        """Close and delete the file; spilled outputs can't be read afterwards."""
+        with self._lock:
+            if self._finalizer is not None:
+                self._finalizer()
+            self._file = None
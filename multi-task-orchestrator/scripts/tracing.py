@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Scheduler Tracing.
+Monotonic per-task timelines, Chrome trace-event export and critical-path analysis.
+"""
+
+import json
+import time
+from typing import Dict, List, Optional
+
+
+class TaskTrace:
+    """Timeline of one task. All times are seconds since the run started."""
+
+    __slots__ = ("task_id", "name", "enqueued", "ready", "completed", "status", "attempts")
+
+    def __init__(self, task_id: str, name: str, enqueued: float):
+        self.task_id = task_id
+        self.name = name
+        self.enqueued = enqueued
+        self.ready: Optional[float] = None
+        self.completed: Optional[float] = None
+        self.status: Optional[str] = None
+        # One dict per attempt: slot (acquired), start, end, status, lane
+        self.attempts: List[Dict] = []
+
+
+class Tracer:
+    """Collects task timelines from the orchestrator's scheduler hooks."""
+
+    def __init__(self):
+        self.origin = time.monotonic()
+        self.traces: Dict[str, TaskTrace] = {}
+        self._free_lanes: List[int] = []
+        self._next_lane = 0
+
+    def _now(self) -> float:
+        return time.monotonic() - self.origin
+
+    def enqueued(self, task_id: str, name: str):
+        self.traces[task_id] = TaskTrace(task_id, name, self._now())
+
+    def ready(self, task_id: str):
+        trace = self.traces.get(task_id)
+        if trace and trace.ready is None:
+            trace.ready = self._now()
+
+    def slot_acquired(self, task_id: str):
+        # Lanes give each concurrently running attempt its own row in the trace viewer
+        if self._free_lanes:
+            lane = min(self._free_lanes)
+            self._free_lanes.remove(lane)
+        else:
+            lane = self._next_lane
+            self._next_lane += 1
+        self.traces[task_id].attempts.append({
+            "slot": self._now(), "start": None, "end": None, "status": None, "lane": lane
+        })
+
+    def attempt_started(self, task_id: str):
+        self.traces[task_id].attempts[-1]["start"] = self._now()
+
+    def attempt_finished(self, task_id: str, status: str):
+        attempt = self.traces[task_id].attempts[-1]
+        attempt["end"] = self._now()
+        attempt["status"] = status
+        self._free_lanes.append(attempt["lane"])
+
+    def completed(self, task_id: str, status: str):
+        trace = self.traces.get(task_id)
+        if trace:
+            trace.completed = self._now()
+            trace.status = status
+
+    def chrome_trace(self) -> Dict:
+        """Build a Chrome trace-event document (chrome://tracing, Perfetto)."""
+        events = [
+            {"ph": "M", "pid": 1, "name": "process_name", "args": {"name": "running"}},
+            {"ph": "M", "pid": 2, "name": "process_name", "args": {"name": "waiting"}},
+        ]
+        us = 1_000_000
+
+        for index, trace in enumerate(self.traces.values()):
+            # Waits render as async spans so thousands of them don't need their own rows
+            waits = [("dependencies", trace.enqueued, trace.ready)]
+            previous_end = None
+            for attempt in trace.attempts:
+                if previous_end is not None:
+                    waits.append(("retry backoff", previous_end, attempt["slot"]))
+                else:
+                    waits.append(("queued for slot", trace.ready, attempt["slot"]))
+                previous_end = attempt["end"]
+
+            for label, begin, end in waits:
+                if begin is None or end is None or end <= begin:
+                    continue
+                common = {"pid": 2, "tid": 0, "cat": label, "name": f"{trace.name} [{label}]",
+                          "id": index}
+                events.append({**common, "ph": "b", "ts": begin * us})
+                events.append({**common, "ph": "e", "ts": end * us})
+
+            for number, attempt in enumerate(trace.attempts, 1):
+                start = attempt["start"] if attempt["start"] is not None else attempt["slot"]
+                if attempt["end"] is None:
+                    continue
+                events.append({
+                    "ph": "X", "pid": 1, "tid": attempt["lane"],
+                    "name": trace.name, "cat": "attempt",
+                    "ts": start * us, "dur": (attempt["end"] - start) * us,
+                    "args": {"task_id": trace.task_id, "attempt": number,
+                             "status": attempt["status"]},
+                })
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def breakdown(self, task_id: str) -> Dict[str, float]:
+        """Where one task's wall-clock time went."""
+        trace = self.traces[task_id]
+        dependency_wait = (trace.ready - trace.enqueued) if trace.ready is not None else 0.0
+        queue_wait = run = backoff = 0.0
+        previous_end = trace.ready
+        for attempt in trace.attempts:
+            start = attempt["start"] if attempt["start"] is not None else attempt["slot"]
+            end = attempt["end"] if attempt["end"] is not None else start
+            gap = attempt["slot"] - previous_end if previous_end is not None else 0.0
+            if attempt is trace.attempts[0]:
+                queue_wait += gap
+            else:
+                backoff += gap
+            queue_wait += start - attempt["slot"]
+            run += end - start
+            previous_end = end
+        return {
+            "dependency_wait": round(dependency_wait, 6),
+            "queue_wait": round(queue_wait, 6),
+            "run": round(run, 6),
+            "retry_backoff": round(backoff, 6),
+        }
+
+    def critical_path(self, dependencies: Dict[str, List[str]]) -> Dict:
+        """
+        Walk back from the last task to finish, following at each step the
+        dependency that completed last (the one that actually released it).
+        """
+        finished = [t for t in self.traces.values() if t.completed is not None]
+        if not finished:
+            return {"makespan": 0.0, "path": []}
+
+        current = max(finished, key=lambda t: t.completed)
+        path = []
+        while current is not None:
+            path.append(current.task_id)
+            deps = [self.traces[d] for d in dependencies.get(current.task_id, ())
+                    if d in self.traces and self.traces[d].completed is not None]
+            current = max(deps, key=lambda t: t.completed) if deps else None
+        path.reverse()
+
+        steps = [{"task_id": task_id, **self.breakdown(task_id)} for task_id in path]
+        # Dependency waits overlap the predecessors on the path, so they aren't summed
+        totals = {key: round(sum(step[key] for step in steps), 6)
+                  for key in ("queue_wait", "run", "retry_backoff")}
+        return {
+            "makespan": round(self.traces[path[-1]].completed, 6),
+            "path": steps,
+            "totals": totals,
+        }
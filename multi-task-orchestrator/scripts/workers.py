@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Killable Workers.
+Process pool whose workers can be killed and replaced when a sync task times out,
+so hung calls can't hold a worker (or keep causing side effects) after the deadline.
+"""
+
+import asyncio
+import inspect
+import multiprocessing
+import pickle
+from typing import Any, Callable, List, Optional, Set
+
+
+def call_pickled(payload: bytes) -> Any:
+    """
+    Run a (func, args, kwargs) job the parent pickled up front. Sending bytes
+    means the job is serialized once, and an unpicklable job fails in the
+    parent instead of inside a pool's feeder thread.
+    """
+    func, args, kwargs = pickle.loads(payload)
+    value = func(*args, **kwargs)
+    if inspect.iscoroutine(value):  # Async funcs sent to broker workers
+        value = asyncio.run(value)
+    return value
+
+
+def _worker_main(conn):
+    """Worker loop: run (func, args, kwargs) jobs until told to stop."""
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+
+        func, args, kwargs = job
+        exiting = False
+        try:
+            reply = (True, func(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+        except BaseException as e:
+            # SystemExit/KeyboardInterrupt re-raised in the parent would stop its
+            # event loop; report a lost worker instead and let it be replaced
+            reply = (False, WorkerDied(f"Task raised {type(e).__name__}: {e}"))
+            exiting = True
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable return value or exception: report it as text instead
+            detail = reply[1] if not reply[0] else e
+            conn.send((False, RuntimeError(f"{type(detail).__name__}: {detail}")))
+        if exiting:
+            break
+
+
+class WorkerDied(RuntimeError):
+    """The worker process exited before returning a result."""
+
+
+class KillableWorker:
+    """One worker process plus the parent end of its pipe."""
+
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    async def run(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        loop = asyncio.get_running_loop()
+        reply = loop.create_future()
+        fd = self.conn.fileno()
+
+        def on_readable():
+            loop.remove_reader(fd)
+            if reply.done():
+                return
+            try:
+                reply.set_result(self.conn.recv())
+            except (EOFError, OSError):
+                reply.set_exception(WorkerDied(f"Worker {self.process.pid} exited"))
+
+        self.conn.send((func, args, kwargs))
+        loop.add_reader(fd, on_readable)
+        try:
+            ok, value = await reply
+        finally:
+            loop.remove_reader(fd)
+
+        if not ok:
+            raise value
+        return value
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class KillableWorkerPool:
+    """
+    Up to `size` single-job worker processes. A job that times out (or is
+    cancelled) gets its worker killed; a fresh one is spawned on demand, so
+    the pool's capacity survives hung calls across long batches.
+    """
+
+    def __init__(self, size: int, context: Optional[str] = None):
+        self.size = size
+        self.ctx = multiprocessing.get_context(context)
+        self.idle: List[KillableWorker] = []
+        self.workers: Set[KillableWorker] = set()
+        self.waiters: List[asyncio.Future] = []
+        self.killed = 0
+
+    async def _acquire(self) -> KillableWorker:
+        while True:
+            if self.idle:
+                return self.idle.pop()
+            if len(self.workers) < self.size:
+                worker = KillableWorker(self.ctx)
+                self.workers.add(worker)
+                return worker
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+
+    def _wake_one(self):
+        while self.waiters:
+            waiter = self.waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _release(self, worker: KillableWorker):
+        self.idle.append(worker)
+        self._wake_one()
+
+    def _discard(self, worker: KillableWorker):
+        worker.kill()
+        self.workers.discard(worker)
+        self.killed += 1
+        self._wake_one()  # A replacement can be spawned in its place
+
+    async def run(self, func: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+                  timeout: Optional[float] = None) -> Any:
+        """Run func in a worker; on timeout or cancellation the worker is killed."""
+        worker = await self._acquire()
+        try:
+            value = await asyncio.wait_for(worker.run(func, args, kwargs or {}), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError, WorkerDied):
+            self._discard(worker)
+            raise
+        except BaseException:
+            self._release(worker)  # The task raised; the worker itself is fine
+            raise
+        self._release(worker)
+        return value
+
+    def shutdown(self):
+        for worker in list(self.workers):
+            worker.stop()
+        self.workers.clear()
+        self.idle.clear()
@@ -0,0 +1,213 @@
+import asyncio
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import orchestrator
+from distributed import BrokerWorker, QueueBroker
+from orchestrator import Orchestrator, Task, TaskStatus
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Cache and spill directories default to the cwd
+
+
+def test_dynamic_task_rejected_edge_leaves_graph_intact():
+    raised = []
+    
+    def parent(ctx):
+        try:
+            ctx.add_task(Task(id="child", name="child", func=lambda: "child"),
+                         required_by=["agg", "done_already"])
+        except ValueError as e:
+            raised.append(e)
+        return "parent"
+    
+    orch = Orchestrator(max_concurrent=2)
+    orch.add_task(Task(id="done_already", name="done", func=lambda: "done"))
+    orch.add_task(Task(id="parent", name="parent", func=parent, context=True,
+                       dependencies=["done_already"]))
+    orch.add_task(Task(id="agg", name="agg", func=lambda: "agg", dependencies=["parent"]))
+    asyncio.run(orch.run())
+    
+    assert len(raised) == 1
+    assert "child" not in orch.tasks and "child" not in orch.results
+    assert orch.tasks["agg"].dependencies == ["parent"]
+    assert {task_id: r.status for task_id, r in orch.results.items()} == {
+        "done_already": TaskStatus.SUCCESS,
+        "parent": TaskStatus.SUCCESS,
+        "agg": TaskStatus.SUCCESS,
+    }
+
+
+def test_process_timeout_does_not_wait_for_the_job():
+    orch = Orchestrator(executor="process")
+    orch.add_task(Task(id="slow", name="slow", func=time.sleep, args=(3,), timeout=0.5, retries=1))
+    start = time.perf_counter()
+    asyncio.run(orch.run())
+    
+    assert orch.results["slow"].status == TaskStatus.FAILED
+    assert time.perf_counter() - start < 2
+
+
+async def _collect(stream):
+    return [result async for result in stream]
+
+
+def test_stream_dependents_of_evicted_success(capsys):
+    source = [Task(id="a", name="a", func=lambda: "a")]
+    source += [Task(id=f"b{i}", name="b", func=lambda: "b", dependencies=["a"]) for i in range(10)]
+    orch = Orchestrator(max_concurrent=2)
+    results = asyncio.run(_collect(orch.stream(source, window=2, retain_results=False)))
+    
+    assert [r.status for r in results] == [TaskStatus.SUCCESS] * 11
+    assert "Unknown dependency" not in capsys.readouterr().out
+
+
+def test_slow_source_does_not_delay_ready_tasks():
+    started = {}
+    
+    def work(name):
+        started[name] = time.perf_counter()
+    
+    async def source():
+        yield Task(id="first", name="work", func=work, args=("first",))
+        await asyncio.sleep(1)
+        yield Task(id="second", name="work", func=work, args=("second",))
+    
+    orch = Orchestrator(max_concurrent=2)
+    begin = time.perf_counter()
+    results = asyncio.run(_collect(orch.stream(source())))
+    
+    assert [r.task_id for r in results] == ["first", "second"]
+    assert started["first"] - begin < 0.5
+
+
+def test_failed_attempts_retry_after_backoff():
+    failed_once = set()
+    
+    def flaky(i):
+        if i not in failed_once:
+            failed_once.add(i)
+            raise ValueError("first attempt")
+        return i
+    
+    orch = Orchestrator(max_concurrent=10, retry_backoff=0.05, max_backoff=0.05)
+    orch.add_tasks([Task(id=f"t{i}", name="flaky", func=flaky, args=(i,), retries=2)
+                    for i in range(50)])
+    asyncio.run(orch.run())
+    
+    assert all(r.status == TaskStatus.SUCCESS and r.attempts == 2 for r in orch.results.values())
+    assert orch.retries_used == 50
+
+
+def test_abort_cancels_pending_retry(monkeypatch):
+    monkeypatch.setattr(orchestrator.random, "uniform", lambda low, high: high)
+    
+    def retry_me():
+        raise ValueError("retry me")
+    
+    def fatal():
+        time.sleep(0.1)
+        raise ValueError("fatal")
+    
+    orch = Orchestrator(on_failure="abort", retry_backoff=5, max_backoff=5)
+    orch.add_task(Task(id="backoff", name="backoff", func=retry_me, retries=3))
+    orch.add_task(Task(id="fatal", name="fatal", func=fatal, retries=1))
+    start = time.perf_counter()
+    asyncio.run(orch.run())
+    
+    assert time.perf_counter() - start < 2
+    assert orch.results["backoff"].status == TaskStatus.CANCELLED
+    assert orch.abort_info["trigger"] == "fatal"
+
+
+def _interrupt():
+    raise KeyboardInterrupt
+
+
+def test_killable_task_exit_fails_the_task_not_the_run():
+    orch = Orchestrator(executor="killable", max_concurrent=1, max_workers=1)
+    orch.add_task(Task(id="exit", name="exit", func=sys.exit, args=(3,), retries=1))
+    orch.add_task(Task(id="interrupt", name="interrupt", func=_interrupt, retries=1))
+    orch.add_task(Task(id="after", name="after", func=abs, args=(-1,)))
+    asyncio.run(orch.run())
+    
+    assert orch.results["exit"].status == TaskStatus.FAILED
+    assert orch.results["exit"].error == "WorkerDied: Task raised SystemExit: 3"
+    assert orch.results["interrupt"].error == "WorkerDied: Task raised KeyboardInterrupt: "
+    assert orch.results["after"].output == 1
+
+
+def test_journal_resumes_tasks_with_sets_and_mixed_key_dicts(capsys):
+    calls = []
+    
+    def work(options, tags):
+        calls.append(options)
+        return len(tags)
+    
+    def build():
+        orch = Orchestrator(journal="journal.db")
+        orch.add_task(Task(id="mixed", name="work", func=work,
+                           args=({1: "a", "b": 2}, {"x", "y", "z"})))
+        orch.add_task(Task(id="opaque", name="work", func=work, args=(object(), set())))
+        return orch
+    
+    first = build()
+    asyncio.run(first.run())
+    assert first.results["mixed"].output == 3
+    assert "opaque can't be fingerprinted" in capsys.readouterr().out
+    
+    second = build()
+    asyncio.run(second.run())
+    assert second.resumed == 1
+    assert second.results["mixed"].output == 3
+    assert len(calls) == 3  # mixed once, opaque on both runs
+
+
+def test_metrics_server_closed_after_run():
+    threads = threading.active_count()
+    orch = Orchestrator(metrics_port=0)
+    orch.add_task(Task(id="a", name="a", func=abs, args=(-1,)))
+    asyncio.run(orch.run())
+    
+    assert orch.metrics.url is None
+    assert threading.active_count() == threads
+
+
+def test_broker_write_lock_does_not_stall_event_loop():
+    QueueBroker("queue.db").open().close()
+    locker = sqlite3.connect("queue.db", isolation_level=None, check_same_thread=False)
+    locker.execute("BEGIN IMMEDIATE")  # Another writer holds the database for 0.5s
+    release = threading.Timer(0.5, locker.execute, args=("COMMIT",))
+    release.start()
+    worker = BrokerWorker("queue.db", poll=0.01)
+    threading.Thread(target=worker.run, kwargs={"max_jobs": 1, "idle_timeout": 10},
+                     daemon=True).start()
+    
+    orch = Orchestrator(executor="broker", broker="queue.db")
+    orch.add_task(Task(id="a", name="a", func=abs, args=(-1,)))
+    
+    async def main():
+        run = asyncio.ensure_future(orch.run())
+        lag = 0.0
+        while not run.done():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - start - 0.01)
+        await run
+        return lag
+    
+    lag = asyncio.run(main())
+    release.join()
+    locker.close()
+    
+    assert orch.results["a"].output == 1
+    assert lag < 0.25
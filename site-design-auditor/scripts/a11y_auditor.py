@@ -10,18 +10,12 @@ import re
 import sys
 from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import urljoin, urlparse
 
-try:
-    import requests
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("Installing dependencies...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", 
-                          "requests", "beautifulsoup4", "--break-system-packages", "-q"])
-    import requests
-    from bs4 import BeautifulSoup
+sys.path.insert(0, str(Path(__file__).parent))
+from fetch_cache import shared_cache
+from page_parser import make_soup
 
 
 class A11yAuditor:
@@ -35,8 +29,10 @@ class A11yAuditor:
     # Touch target size (WCAG 2.5.5)
     MIN_TOUCH_TARGET = 44
     
-    def __init__(self, level='AA'):
+    def __init__(self, level='AA', fetcher=None, parser=None):
         self.level = level
+        self.fetcher = fetcher or shared_cache()
+        self.parser = parser  # page_parser backend; None picks the fastest installed
         self.issues = []
         self.stats = defaultdict(int)
         
@@ -45,10 +41,7 @@ class A11yAuditor:
         print(f"  Auditing: {url}")
         
         try:
-            response = requests.get(url, timeout=15, headers={
-                'User-Agent': 'A11yAuditor/1.0'
-            })
-            response.raise_for_status()
+            response = self.fetcher.get(url)
         except Exception as e:
             self.issues.append({
                 'type': 'crawl_error',
@@ -59,7 +52,7 @@ class A11yAuditor:
             })
             return
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text, self.parser)
         
         # Run all audits
         self._audit_images(soup, url)
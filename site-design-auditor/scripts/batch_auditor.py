@@ -18,6 +18,8 @@ sys.path.insert(0, str(script_dir))
 
 from css_auditor import CSSAuditor
 from a11y_auditor import A11yAuditor
+from fetch_cache import FetchCache
+from page_parser import BACKENDS
 
 
 # Default site configuration for Nick's 17-site network
@@ -64,12 +66,16 @@ DEFAULT_SITES = [
 class BatchAuditor:
     """Run audits across multiple sites."""
     
-    def __init__(self, sites, output_dir='./audit-reports'):
+    def __init__(self, sites, output_dir='./audit-reports', cache_dir='.audit-cache',
+                 parser=None):
         self.sites = sites
+        self.parser = parser  # HTML parser backend for every auditor (None = fastest installed)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.results = []
+        # One cache for every auditor and site: each URL is fetched at most once per run
+        self.fetcher = FetchCache(cache_dir)
         
     def run_full_audit(self, css_depth=2, a11y_level='AA', parallel=False):
         """Run all audits on all sites."""
@@ -138,7 +144,9 @@ class BatchAuditor:
             css_auditor = CSSAuditor(
                 site['url'], 
                 site.get('tokens'),
-                css_depth
+                css_depth,
+                fetcher=self.fetcher,
+                parser=self.parser
             )
             css_report = css_auditor.audit()
             result['audits']['css'] = css_report
@@ -150,7 +158,7 @@ class BatchAuditor:
             
             # Accessibility Audit
             print(f"  ♿ Running accessibility audit...")
-            a11y_auditor = A11yAuditor(a11y_level)
+            a11y_auditor = A11yAuditor(a11y_level, fetcher=self.fetcher, parser=self.parser)
             a11y_auditor.audit_url(site['url'])
             a11y_report = a11y_auditor.generate_report(site['url'])
             result['audits']['accessibility'] = a11y_report
@@ -359,6 +367,7 @@ class BatchAuditor:
         print(f"Failed: {summary['failed_audits']}")
         print(f"\nTotal Issues: {summary['total_issues']}")
         print(f"High Priority: {summary['high_priority']}")
+        print(f"HTTP: {self.fetcher.summary()}")
         
         print("\n📈 By Vertical:")
         for vertical, data in summary['by_vertical'].items():
@@ -389,6 +398,12 @@ def main():
                         help='Run audits in parallel')
     parser.add_argument('--sites', '-s', nargs='+',
                         help='Specific site URLs to audit')
+    parser.add_argument('--cache-dir', default='.audit-cache',
+                        help='HTTP cache directory (pages are revalidated with conditional requests)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not keep an on-disk HTTP cache between runs')
+    parser.add_argument('--parser', choices=('auto',) + BACKENDS, default='auto',
+                        help='HTML parser backend (auto picks the fastest installed)')
     
     args = parser.parse_args()
     
@@ -403,7 +418,9 @@ def main():
         print("Using default site configuration...")
         sites = DEFAULT_SITES
     
-    auditor = BatchAuditor(sites, args.output)
+    auditor = BatchAuditor(sites, args.output,
+                           cache_dir=None if args.no_cache else args.cache_dir,
+                           parser=args.parser)
     summary = auditor.run_full_audit(
         css_depth=args.depth,
         a11y_level=args.level,
@@ -10,24 +10,20 @@ import re
 import sys
 from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
 
-try:
-    import requests
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("Installing dependencies...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", 
-                          "requests", "beautifulsoup4", "--break-system-packages", "-q"])
-    import requests
-    from bs4 import BeautifulSoup
+sys.path.insert(0, str(Path(__file__).parent))
+from fetch_cache import shared_cache
+from page_parser import make_soup
 
 
 class BrandComplianceChecker:
     """Check website compliance with brand design tokens."""
     
-    def __init__(self, tokens_file):
+    def __init__(self, tokens_file, fetcher=None, parser=None):
         self.tokens = self._load_tokens(tokens_file)
+        self.fetcher = fetcher or shared_cache()
+        self.parser = parser  # page_parser backend; None picks the fastest installed
         self.issues = []
         self.stats = defaultdict(int)
         
@@ -41,14 +37,11 @@ class BrandComplianceChecker:
         print(f"  Checking: {url}")
         
         try:
-            response = requests.get(url, timeout=15, headers={
-                'User-Agent': 'BrandChecker/1.0'
-            })
-            response.raise_for_status()
+            response = self.fetcher.get(url)
         except Exception as e:
             return {'error': str(e)}
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text, self.parser)
         
         # Run all checks
         self._check_colors(soup, url)
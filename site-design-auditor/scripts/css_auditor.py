@@ -6,35 +6,242 @@ Crawls websites and detects CSS inconsistencies, inline style abuse,
 """
 
 import argparse
+import asyncio
 import json
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlparse
 
 try:
-    import requests
-    from bs4 import BeautifulSoup
+    import aiohttp
 except ImportError:
     print("Installing dependencies...")
     import subprocess
     subprocess.check_call([sys.executable, "-m", "pip", "install", 
-                          "requests", "beautifulsoup4", "--break-system-packages", "-q"])
-    import requests
-    from bs4 import BeautifulSoup
+                          "aiohttp", "--break-system-packages", "-q"])
+    import aiohttp
+
+sys.path.insert(0, str(Path(__file__).parent))
+from fetch_cache import cache_key, shared_cache
+from page_parser import BACKENDS, parse_elements, resolve_backend
+from rule_engine import Rule, RuleEngine
+from stylesheets import StylesheetCache
+
+
+HEADERS = {'User-Agent': 'SiteDesignAuditor/1.0'}
+SKIP_SCHEMES = ('#', 'mailto:', 'tel:', 'javascript:')
+COLOR_PATTERN = re.compile(r'#[0-9a-fA-F]{3,6}|rgb\([^)]+\)|rgba\([^)]+\)')
+SPACING_PATTERN = re.compile(r':\s*([\d.]+)(px|rem|em)\s*[;}]')
+LENGTH_PATTERN = re.compile(r'[\d.]+(?:px|rem|em)')
+GENERIC_FONTS = ('inherit', 'initial', 'unset', 'sans-serif', 'serif', 'monospace', 'system-ui', 'cursive')
+
+
+class InlineStyleRule(Rule):
+    """Detect inline styles that should be in CSS."""
+    attributes = ('style',)
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def visit(self, elem, page):
+        found = set()
+        for prop, _, _ in page.declarations(elem):
+            if prop == 'color' or prop.endswith('-color'):
+                found.add('color')
+            if prop.startswith('font-'):
+                found.add('font')
+            elif prop.startswith('background'):
+                found.add('background')
+            elif prop.startswith(('margin', 'padding')):
+                found.add('spacing')
+
+        if found:
+            concerns = [c for c in ('color', 'font', 'background', 'spacing') if c in found]
+            page.report(self, {
+                'type': 'inline_style',
+                'severity': 'medium',
+                'location': page.url,
+                'element': elem.name,
+                'selector': page.selector(elem),
+                'style': elem['style'][:100],
+                'concerns': concerns,
+                'fix': f"Move {', '.join(concerns)} to CSS class using design tokens"
+            })
+            self.stats['inline_styles'] += 1
+
+
+class ImportantRule(Rule):
+    """Detect !important overuse in style tags and inline styles."""
+    tags = ('style',)
+    attributes = ('style',)
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def visit(self, elem, page):
+        if elem.name == 'style':
+            important_count = (elem.string or '').lower().count('!important')
+            if important_count > 3:  # Threshold for concern
+                page.report(self, {
+                    'type': 'important_abuse',
+                    'severity': 'high',
+                    'location': page.url,
+                    'selector': 'style tag',
+                    'count': important_count,
+                    'fix': "Refactor CSS to avoid !important dependency"
+                })
+                self.stats['important_count'] += important_count
+        if elem.get('style') is not None:
+            important_count = sum(important for _, _, important in page.declarations(elem))
+            if important_count > 0:
+                page.report(self, {
+                    'type': 'important_abuse',
+                    'severity': 'high',
+                    'location': page.url,
+                    'selector': page.selector(elem),
+                    'count': important_count,
+                    'fix': "Remove !important and fix CSS specificity instead"
+                })
+                self.stats['important_count'] += important_count
+
+
+class ColorRule(Rule):
+    """Check inline colors against design tokens."""
+    attributes = ('style',)
+
+    def __init__(self, stats, token_colors):
+        self.stats = stats
+        self.token_colors = set(v.lower() for v in token_colors)
+
+    def visit(self, elem, page):
+        for _, value, _ in page.declarations(elem):
+            for color in COLOR_PATTERN.findall(value):
+                color_lower = color.lower()
+                if color_lower not in self.token_colors and not color_lower.startswith('rgba'):
+                    page.report(self, {
+                        'type': 'color_inconsistency',
+                        'severity': 'medium',
+                        'location': page.url,
+                        'selector': page.selector(elem),
+                        'found_color': color,
+                        'expected': 'Use CSS variable from design tokens',
+                        'fix': f"Replace {color} with var(--color-*)"
+                    })
+                    self.stats['color_violations'] += 1
+
+
+class TypographyRule(Rule):
+    """Flag font declarations in inline styles."""
+    attributes = ('style',)
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def visit(self, elem, page):
+        for prop, value, _ in page.declarations(elem):
+            if prop == 'font-family':
+                page.report(self, {
+                    'type': 'inline_typography',
+                    'severity': 'medium',
+                    'location': page.url,
+                    'selector': page.selector(elem),
+                    'font': value,
+                    'fix': "Use CSS class with var(--font-family-*)"
+                })
+                self.stats['typography_violations'] += 1
+
+
+class SpacingVariableRule(Rule):
+    """Report hardcoded spacing values repeated across a page's style tags."""
+    tags = ('style',)
+
+    def start_page(self, page):
+        self.values = defaultdict(int)
+
+    def visit(self, elem, page):
+        for value, unit in SPACING_PATTERN.findall(elem.string or ''):
+            self.values[f"{value}{unit}"] += 1
+
+    def end_page(self, page):
+        for value, count in self.values.items():
+            if count > 5:
+                page.report(self, {
+                    'type': 'missing_variable',
+                    'severity': 'low',
+                    'location': page.url,
+                    'value': value,
+                    'occurrences': count,
+                    'fix': f"Create CSS variable for repeated value {value}"
+                })
+
+
+class LinkRule(Rule):
+    """Collect same-domain links and <link rel=stylesheet> URLs to crawl next."""
+    tags = ('a', 'link')
+
+    def __init__(self, domain):
+        self.domain = domain
+
+    def start_page(self, page):
+        self.links = []
+        self.stylesheets = []
+
+    def visit(self, elem, page):
+        href = (elem.get('href') or '').strip()
+        if not href or href.startswith(SKIP_SCHEMES):
+            return
+        if elem.name == 'link':
+            rel = elem.get('rel') or ''
+            rel = rel.split() if isinstance(rel, str) else rel  # bs4 gives a list
+            if 'stylesheet' not in (r.lower() for r in rel):
+                return
+            found = self.stylesheets
+        else:
+            found = self.links
+        target = urldefrag(urljoin(page.url, href))[0]
+        if urlparse(target).netloc == self.domain:
+            found.append(target)
 
 
 class CSSAuditor:
-    def __init__(self, base_url, tokens_file=None, max_depth=3):
+    def __init__(self, base_url, tokens_file=None, max_depth=3,
+                 concurrency=10, per_host=4, max_pages=None, fetcher=None, parser=None):
         self.base_url = base_url.rstrip('/')
         self.domain = urlparse(base_url).netloc
         self.max_depth = max_depth
+        self.concurrency = concurrency  # Pages in flight across the crawl
+        self.per_host = per_host  # Connection cap per host (be polite to WordPress)
+        self.max_pages = max_pages
+        self.fetcher = fetcher or shared_cache()  # Shared with other auditors in this run
+        self.parser = resolve_backend(parser)
         self.visited = set()
+        self.stylesheets = set()
         self.issues = []
         self.tokens = self._load_tokens(tokens_file) if tokens_file else {}
         self.css_stats = defaultdict(int)
         
+        # Stylesheets are parsed once per content hash, and audited once per crawl
+        cache_dir = self.fetcher.cache_dir / 'parsed-css' if self.fetcher.cache_dir else None
+        self.css_cache = StylesheetCache(cache_dir)
+        self.audited_css = set()
+        self.token_colors = set(v.lower() for v in self.tokens.get('colors', {}).values())
+        self.brand_fonts = set(
+            stack.split(',')[0].strip().strip('"\'').lower()
+            for stack in self.tokens.get('typography', {}).get('fontFamily', {}).values()
+        )
+        
+        # All audits share one walk per page; parsing happens on a single worker thread
+        rules = [InlineStyleRule(self.css_stats), ImportantRule(self.css_stats)]
+        if self.tokens.get('colors'):
+            rules.append(ColorRule(self.css_stats, self.tokens['colors'].values()))
+        rules += [TypographyRule(self.css_stats), SpacingVariableRule()]
+        self.link_rule = LinkRule(self.domain)
+        self.rules = RuleEngine(rules + [self.link_rule])
+        
     def _load_tokens(self, filepath):
         """Load design tokens from JSON file."""
         try:
@@ -49,183 +256,199 @@ class CSSAuditor:
         print(f"\n🔍 Auditing {self.base_url}")
         print("=" * 60)
         
-        self._crawl(self.base_url, 0)
+        asyncio.run(self._crawl())
         
         return self._generate_report()
     
-    def _crawl(self, url, depth):
-        """Recursively crawl site pages."""
-        if depth > self.max_depth or url in self.visited:
-            return
-            
-        # Normalize URL
-        if not url.startswith('http'):
-            url = urljoin(self.base_url, url)
-            
-        # Stay on same domain
-        if urlparse(url).netloc != self.domain:
-            return
+    async def _crawl(self):
+        """
+        Breadth-first crawl: fetchers drain a frontier queue level by level.
+        Parsing and audits run on a worker thread so they overlap with downloads.
+        Stylesheets share the queue with depth None and don't count as pages.
+        """
+        frontier = asyncio.Queue()
+        seen = {cache_key(self.base_url)}  # Normalized, so the homepage counts once toward max_pages
+        frontier.put_nowait((self.base_url, 0))
+        
+        loop = asyncio.get_running_loop()
+        # One thread: audits append to shared state, and the GIL caps parse throughput anyway
+        parser = ThreadPoolExecutor(max_workers=1)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        timeout = aiohttp.ClientTimeout(total=10)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=HEADERS) as session:
+            async def fetcher():
+                while True:
+                    url, depth = await frontier.get()
+                    try:
+                        if depth is None:
+                            css = await self._fetch_stylesheet(session, url)
+                            if css is None:
+                                continue
+                            stylesheets = await loop.run_in_executor(
+                                parser, self._process_stylesheet, css, url)
+                        else:
+                            html = await self._fetch(session, url)
+                            if html is None:
+                                continue
+                            links, stylesheets = await loop.run_in_executor(
+                                parser, self._process_page, html, url)
+                        for sheet in stylesheets:
+                            if sheet not in self.stylesheets:
+                                self.stylesheets.add(sheet)
+                                frontier.put_nowait((sheet, None))
+                        if depth is None or depth >= self.max_depth:
+                            continue
+                        for link in links:
+                            if self.max_pages is not None and len(seen) >= self.max_pages:
+                                break
+                            key = cache_key(link)
+                            if key not in seen:
+                                seen.add(key)
+                                frontier.put_nowait((link, depth + 1))
+                    except Exception as e:
+                        # Keep the worker alive: if every fetcher died, frontier.join() would never return
+                        self.issues.append({
+                            'type': 'crawl_error',
+                            'severity': 'low',
+                            'location': url,
+                            'message': f"Audit failed: {e}" if str(e) else type(e).__name__
+                        })
+                    finally:
+                        frontier.task_done()
             
+            fetchers = [asyncio.create_task(fetcher()) for _ in range(self.concurrency)]
+            try:
+                await frontier.join()
+            finally:
+                for task in fetchers:
+                    task.cancel()
+                await asyncio.gather(*fetchers, return_exceptions=True)
+                parser.shutdown(wait=True)
+    
+    async def _fetch(self, session, url):
+        """Download one page; returns its HTML, or None on error or non-HTML content."""
         self.visited.add(url)
         print(f"  Scanning: {url}")
         
         try:
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'SiteDesignAuditor/1.0'
-            })
-            response.raise_for_status()
+            response = await self.fetcher.aget(session, url)
+            if 'html' not in response.content_type:
+                return None
+            return response.text
         except Exception as e:
             self.issues.append({
                 'type': 'crawl_error',
                 'severity': 'low',
                 'location': url,
-                'message': str(e)
+                'message': str(e) or type(e).__name__
             })
-            return
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Run audits on this page
-        self._audit_inline_styles(soup, url)
-        self._audit_important_abuse(soup, url)
-        self._audit_color_consistency(soup, url)
-        self._audit_typography(soup, url)
-        self._audit_css_variables(soup, url)
-        
-        # Find more links
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if not href.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
-                self._crawl(href, depth + 1)
+            return None
     
-    def _audit_inline_styles(self, soup, url):
-        """Detect inline styles that should be in CSS."""
-        elements_with_style = soup.find_all(style=True)
+    async def _fetch_stylesheet(self, session, url):
+        """Download one linked stylesheet; returns its text, or None on error."""
+        print(f"  Stylesheet: {url}")
         
-        for elem in elements_with_style:
-            style = elem.get('style', '')
-            
-            # Flag concerning inline styles
-            concerns = []
-            if 'color:' in style.lower():
-                concerns.append('color')
-            if 'font-' in style.lower():
-                concerns.append('font')
-            if 'background' in style.lower():
-                concerns.append('background')
-            if 'margin' in style.lower() or 'padding' in style.lower():
-                concerns.append('spacing')
-                
-            if concerns:
-                self.issues.append({
-                    'type': 'inline_style',
-                    'severity': 'medium',
-                    'location': url,
-                    'element': elem.name,
-                    'selector': self._get_selector(elem),
-                    'style': style[:100],
-                    'concerns': concerns,
-                    'fix': f"Move {', '.join(concerns)} to CSS class using design tokens"
-                })
-                self.css_stats['inline_styles'] += 1
+        try:
+            response = await self.fetcher.aget(session, url)
+            if 'html' in response.content_type:  # Soft 404 page, not CSS
+                return None
+            return response.text
+        except Exception as e:
+            self.issues.append({
+                'type': 'crawl_error',
+                'severity': 'low',
+                'location': url,
+                'message': str(e) or type(e).__name__
+            })
+            return None
     
-    def _audit_important_abuse(self, soup, url):
-        """Detect !important overuse in style tags and inline styles."""
-        # Check inline styles
-        for elem in soup.find_all(style=True):
-            style = elem.get('style', '')
-            important_count = style.lower().count('!important')
-            if important_count > 0:
-                self.issues.append({
-                    'type': 'important_abuse',
-                    'severity': 'high',
-                    'location': url,
-                    'selector': self._get_selector(elem),
-                    'count': important_count,
-                    'fix': "Remove !important and fix CSS specificity instead"
-                })
-                self.css_stats['important_count'] += important_count
-        
-        # Check style tags
-        for style_tag in soup.find_all('style'):
-            content = style_tag.string or ''
-            important_count = content.lower().count('!important')
-            if important_count > 3:  # Threshold for concern
-                self.issues.append({
-                    'type': 'important_abuse',
-                    'severity': 'high',
-                    'location': url,
-                    'selector': 'style tag',
-                    'count': important_count,
-                    'fix': "Refactor CSS to avoid !important dependency"
-                })
-                self.css_stats['important_count'] += important_count
+    def _process_page(self, html, url):
+        """Parse and audit one page; returns same-domain links and stylesheets to crawl next."""
+        self.issues.extend(self.rules.run(parse_elements(html, self.parser), url))
+        return self.link_rule.links, self.link_rule.stylesheets
     
-    def _audit_color_consistency(self, soup, url):
-        """Check colors against design tokens."""
-        if not self.tokens.get('colors'):
-            return
-            
-        token_colors = set(v.lower() for v in self.tokens['colors'].values())
-        
-        # Find all color declarations
-        color_pattern = re.compile(r'#[0-9a-fA-F]{3,6}|rgb\([^)]+\)|rgba\([^)]+\)')
+    def _process_stylesheet(self, css, url):
+        """Parse (cached by content hash) and audit one stylesheet; returns its same-domain @imports."""
+        parsed = self.css_cache.parse(css)
+        if parsed.sha256 in self.audited_css:
+            return []  # Same file under another URL (e.g. ?ver=), already audited
+        self.audited_css.add(parsed.sha256)
+        self._audit_stylesheet(parsed, url)
         
-        for elem in soup.find_all(style=True):
-            style = elem.get('style', '')
-            colors = color_pattern.findall(style)
-            
-            for color in colors:
-                color_lower = color.lower()
-                if color_lower not in token_colors and not color_lower.startswith('rgba'):
-                    self.issues.append({
-                        'type': 'color_inconsistency',
-                        'severity': 'medium',
-                        'location': url,
-                        'selector': self._get_selector(elem),
-                        'found_color': color,
-                        'expected': 'Use CSS variable from design tokens',
-                        'fix': f"Replace {color} with var(--color-*)"
-                    })
-                    self.css_stats['color_violations'] += 1
+        imports = []
+        for target in parsed.imports:
+            target = urldefrag(urljoin(url, target))[0]
+            if urlparse(target).netloc == self.domain:
+                imports.append(target)
+        return imports
     
-    def _audit_typography(self, soup, url):
-        """Check typography consistency."""
-        # Check for font declarations in inline styles
-        font_pattern = re.compile(r'font-family:\s*([^;]+)')
+    def _audit_stylesheet(self, parsed, url):
+        """Color, typography, !important and variable audits over a stylesheet's rules."""
+        colors = {}  # color -> [occurrences, first selector]
+        fonts = {}  # font stack -> [occurrences, first selector]
+        lengths = defaultdict(int)
+        important_count = 0
         
-        for elem in soup.find_all(style=True):
-            style = elem.get('style', '')
-            fonts = font_pattern.findall(style)
-            
-            for font in fonts:
-                self.issues.append({
-                    'type': 'inline_typography',
-                    'severity': 'medium',
-                    'location': url,
-                    'selector': self._get_selector(elem),
-                    'font': font.strip(),
-                    'fix': "Use CSS class with var(--font-family-*)"
-                })
-                self.css_stats['typography_violations'] += 1
-    
-    def _audit_css_variables(self, soup, url):
-        """Check for proper CSS variable usage."""
-        # Look for hardcoded values that should be variables
-        style_content = ''
-        for style_tag in soup.find_all('style'):
-            style_content += style_tag.string or ''
+        for selector, declarations in parsed.rules:
+            for prop, value, important in declarations:
+                important_count += important
+                if prop.startswith('--'):
+                    continue  # Custom property definitions are where raw values belong
+                if self.token_colors:
+                    for color in COLOR_PATTERN.findall(value):
+                        color_lower = color.lower()
+                        if color_lower not in self.token_colors and not color_lower.startswith('rgba'):
+                            colors.setdefault(color_lower, [0, selector])[0] += 1
+                if prop == 'font-family' and not value.startswith('var('):
+                    fonts.setdefault(value, [0, selector])[0] += 1
+                if LENGTH_PATTERN.fullmatch(value):
+                    lengths[value] += 1
+        self.css_stats['stylesheet_rules'] += len(parsed.rules)
         
-        # Check for hardcoded spacing values
-        spacing_pattern = re.compile(r':\s*([\d.]+)(px|rem|em)\s*[;}]')
-        matches = spacing_pattern.findall(style_content)
+        for color, (count, selector) in colors.items():
+            self.issues.append({
+                'type': 'color_inconsistency',
+                'severity': 'medium',
+                'location': url,
+                'selector': selector,
+                'found_color': color,
+                'occurrences': count,
+                'expected': 'Use CSS variable from design tokens',
+                'fix': f"Replace {color} with var(--color-*)"
+            })
+            self.css_stats['color_violations'] += count
         
-        common_values = defaultdict(int)
-        for value, unit in matches:
-            common_values[f"{value}{unit}"] += 1
+        for stack, (count, selector) in fonts.items():
+            first_font = stack.split(',')[0].strip().strip('"\'').lower()
+            if first_font in GENERIC_FONTS:
+                continue
+            off_brand = bool(self.brand_fonts) and first_font not in self.brand_fonts
+            self.issues.append({
+                'type': 'hardcoded_font',
+                'severity': 'medium' if off_brand else 'low',
+                'location': url,
+                'selector': selector,
+                'font': stack,
+                'occurrences': count,
+                'fix': ("Use a brand font via var(--font-family-*)" if off_brand
+                        else "Use var(--font-family-*) instead of a hardcoded stack")
+            })
+            self.css_stats['typography_violations'] += count
+        
+        if important_count > 3:  # Same threshold as <style> tags
+            self.issues.append({
+                'type': 'important_abuse',
+                'severity': 'high',
+                'location': url,
+                'selector': 'stylesheet',
+                'count': important_count,
+                'fix': "Refactor CSS to avoid !important dependency"
+            })
+            self.css_stats['important_count'] += important_count
         
-        # Report frequently repeated values
-        for value, count in common_values.items():
+        for value, count in lengths.items():
             if count > 5:
                 self.issues.append({
                     'type': 'missing_variable',
@@ -236,15 +459,6 @@ class CSSAuditor:
                     'fix': f"Create CSS variable for repeated value {value}"
                 })
     
-    def _get_selector(self, elem):
-        """Generate a CSS-like selector for an element."""
-        selector = elem.name
-        if elem.get('id'):
-            selector += f"#{elem['id']}"
-        if elem.get('class'):
-            selector += '.' + '.'.join(elem['class'][:2])
-        return selector
-    
     def _generate_report(self):
         """Generate audit report."""
         # Categorize issues
@@ -259,6 +473,8 @@ class CSSAuditor:
             'site': self.base_url,
             'timestamp': datetime.now().isoformat(),
             'pages_scanned': len(self.visited),
+            'stylesheets_scanned': len(self.audited_css),
+            'stylesheet_cache': dict(self.css_cache.stats),
             'issues': self.issues,
             'summary': {
                 'total_issues': len(self.issues),
@@ -279,6 +495,7 @@ class CSSAuditor:
         print("=" * 60)
         print(f"Site: {report['site']}")
         print(f"Pages Scanned: {report['pages_scanned']}")
+        print(f"Stylesheets Scanned: {report.get('stylesheets_scanned', 0)}")
         print(f"Total Issues: {report['summary']['total_issues']}")
         print(f"  🔴 High: {report['summary']['high']}")
         print(f"  🟡 Medium: {report['summary']['medium']}")
@@ -303,10 +520,19 @@ def main():
     parser.add_argument('--tokens', '-t', help='Design tokens JSON file')
     parser.add_argument('--output', '-o', help='Output JSON file')
     parser.add_argument('--depth', '-d', type=int, default=3, help='Max crawl depth')
+    parser.add_argument('--concurrency', '-c', type=int, default=10,
+                        help='Pages fetched in parallel')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='Max connections per host')
+    parser.add_argument('--max-pages', type=int, help='Stop after this many pages')
+    parser.add_argument('--parser', choices=('auto',) + BACKENDS, default='auto',
+                        help='HTML parser backend (auto picks the fastest installed)')
     
     args = parser.parse_args()
     
-    auditor = CSSAuditor(args.url, args.tokens, args.depth)
+    auditor = CSSAuditor(args.url, args.tokens, args.depth,
+                         concurrency=args.concurrency, per_host=args.per_host,
+                         max_pages=args.max_pages, parser=args.parser)
     report = auditor.audit()
     auditor.print_summary(report)
     
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Fetch Cache
+Shared HTTP layer for the auditors: in-process LRU, content-addressed disk
+cache and ETag/Last-Modified conditional requests.
+
+Within one process a URL is downloaded (or revalidated) at most once; later
+requests are served from memory or disk. On re-runs, cached pages are
+revalidated and an unchanged page costs a 304 instead of a full download.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urldefrag, urlparse
+
+try:
+    import requests
+except ImportError:
+    print("Installing dependencies...")
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install",
+                          "requests", "--break-system-packages", "-q"])
+    import requests
+
+
+DEFAULT_HEADERS = {'User-Agent': 'SiteDesignAuditor/1.0'}
+
+
+@dataclass
+class FetchResponse:
+    url: str
+    status: int
+    text: str
+    content_type: str
+    source: str  # memory, disk (validated earlier this run), revalidated (304) or network
+
+
+def cache_key(url: str) -> str:
+    """Drop the fragment and treat an empty path as '/', so equivalent URLs share an entry."""
+    url = urldefrag(url)[0]
+    if not urlparse(url).path:
+        url += '/'
+    return url
+
+
+def _charset(content_type: str) -> str:
+    for part in content_type.split(';')[1:]:
+        key, _, value = part.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"\'')
+    return 'utf-8'
+
+
+class FetchCache:
+    """
+    Disk layout under cache_dir:
+      index/<sha256(url)>.json   validators + content hash for a URL
+      blobs/<hh>/<sha256(body)>  response bodies, shared by identical pages
+    """
+
+    def __init__(self, cache_dir: str = '.audit-cache', memory_entries: int = 256,
+                 timeout: float = 15, headers: Optional[Dict[str, str]] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_entries = memory_entries
+        self.timeout = timeout
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.memory: "OrderedDict[str, FetchResponse]" = OrderedDict()
+        self.validated = set()  # URLs already fetched or revalidated by this process
+        self.lock = threading.Lock()  # Batch audits share one cache across threads
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'not_modified': 0,
+                      'downloads': 0, 'bytes_downloaded': 0}
+
+    # Memory tier
+
+    def _remember(self, response: FetchResponse):
+        with self.lock:
+            self.memory[response.url] = response
+            self.memory.move_to_end(response.url)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def _from_memory(self, url: str) -> Optional[FetchResponse]:
+        with self.lock:
+            response = self.memory.get(url)
+            if response is None:
+                return None
+            self.memory.move_to_end(url)
+            self.stats['memory_hits'] += 1
+        return FetchResponse(url, response.status, response.text, response.content_type, 'memory')
+
+    # Disk tier
+
+    def _index_path(self, url: str) -> Path:
+        return self.cache_dir / 'index' / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.cache_dir / 'blobs' / digest[:2] / digest
+
+    def _write_atomic(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _load_entry(self, url: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._index_path(url)) as f:
+                entry = json.load(f)
+            if not self._blob_path(entry['sha256']).exists():
+                return None
+            return entry
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _load_body(self, entry: Dict) -> str:
+        body = self._blob_path(entry['sha256']).read_bytes()
+        return body.decode(_charset(entry['content_type']), errors='replace')
+
+    def _store(self, url: str, status: int, body: bytes, content_type: str,
+               etag: Optional[str], last_modified: Optional[str]):
+        if not self.cache_dir:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            self._write_atomic(blob, body)
+        entry = {'url': url, 'status': status, 'sha256': digest, 'content_type': content_type,
+                 'etag': etag, 'last_modified': last_modified, 'fetched_at': time.time()}
+        self._write_atomic(self._index_path(url), json.dumps(entry).encode())
+
+    def _conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        headers = dict(self.headers)
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _cached(self, url: str, entry: Dict, source: str) -> FetchResponse:
+        response = FetchResponse(url, entry['status'], self._load_body(entry),
+                                 entry['content_type'], source)
+        self._remember(response)
+        return response
+
+    def _lookup(self, url: str):
+        """Memory hit, or a disk entry already validated this run; else the entry to revalidate."""
+        response = self._from_memory(url)
+        if response is not None:
+            return response, None
+        entry = self._load_entry(url)
+        if entry is not None and url in self.validated:
+            with self.lock:
+                self.stats['disk_hits'] += 1
+            return self._cached(url, entry, 'disk'), None
+        return None, entry
+
+    def _downloaded(self, url: str, status: int, body: bytes, content_type: str,
+                    etag: Optional[str], last_modified: Optional[str]) -> FetchResponse:
+        with self.lock:
+            self.stats['downloads'] += 1
+            self.stats['bytes_downloaded'] += len(body)
+            self.validated.add(url)
+        self._store(url, status, body, content_type, etag, last_modified)
+        response = FetchResponse(url, status, body.decode(_charset(content_type), errors='replace'),
+                                 content_type, 'network')
+        self._remember(response)
+        return response
+
+    def _not_modified(self, url: str, entry: Dict) -> FetchResponse:
+        with self.lock:
+            self.stats['not_modified'] += 1
+            self.validated.add(url)
+        return self._cached(url, entry, 'revalidated')
+
+    # Fetching
+
+    def get(self, url: str) -> FetchResponse:
+        """Blocking fetch; raises requests exceptions (including HTTP errors) like requests.get."""
+        url = cache_key(url)
+        response, entry = self._lookup(url)
+        if response is not None:
+            return response
+
+        r = requests.get(url, timeout=self.timeout, headers=self._conditional_headers(entry))
+        if r.status_code == 304 and entry is not None:
+            return self._not_modified(url, entry)
+        r.raise_for_status()
+        return self._downloaded(url, r.status_code, r.content,
+                                r.headers.get('Content-Type', 'text/html'),
+                                r.headers.get('ETag'), r.headers.get('Last-Modified'))
+
+    async def aget(self, session, url: str) -> FetchResponse:
+        """Same as get() on an aiohttp.ClientSession."""
+        url = cache_key(url)
+        response, entry = self._lookup(url)
+        if response is not None:
+            return response
+
+        async with session.get(url, headers=self._conditional_headers(entry)) as r:
+            if r.status == 304 and entry is not None:
+                return self._not_modified(url, entry)
+            r.raise_for_status()
+            body = await r.read()
+            return self._downloaded(url, r.status, body,
+                                    r.headers.get('Content-Type', 'text/html'),
+                                    r.headers.get('ETag'), r.headers.get('Last-Modified'))
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['downloads']} downloaded ({s['bytes_downloaded'] / 1024:.0f} KB), "
+                f"{s['not_modified']} not modified, {s['memory_hits'] + s['disk_hits']} served from cache")
+
+
+_shared: Optional[FetchCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> FetchCache:
+    """Process-wide cache, so separate auditors in one run share fetches."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FetchCache()
+        return _shared
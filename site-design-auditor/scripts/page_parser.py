@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Page Parser
+Pluggable HTML parsing for the auditors. Backends, fastest first:
+
+  selectolax   lexbor engine (pip install selectolax)
+  lxml         libxml2 (pip install lxml); drops stray markup after </html>
+  html.parser  pure Python, always available
+
+make_soup() returns a BeautifulSoup tree for auditors that use its full API,
+built with lxml when installed. parse_elements() feeds the rule engine, which
+only needs each element's name, attributes and text, so it can use any backend
+directly and skip building a BeautifulSoup tree.
+"""
+
+import sys
+from typing import Iterator, List, Optional
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    print("Installing dependencies...")
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install",
+                          "beautifulsoup4", "--break-system-packages", "-q"])
+    from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+_warned = set()
+
+
+def available_backends() -> List[str]:
+    available = []
+    if LexborHTMLParser is not None:
+        available.append('selectolax')
+    if lxml is not None:
+        available.append('lxml')
+    available.append('html.parser')
+    return available
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Map None/'auto' to the fastest installed backend; fall back if `name` isn't installed."""
+    available = available_backends()
+    if name in (None, 'auto'):
+        return available[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (choose from {', '.join(BACKENDS)})")
+    if name not in available:
+        if name not in _warned:
+            _warned.add(name)
+            print(f"Warning: {name} is not installed, using {available[0]} "
+                  f"(pip install {name} --break-system-packages)")
+        return available[0]
+    return name
+
+
+def make_soup(html: str, backend: Optional[str] = None) -> BeautifulSoup:
+    """BeautifulSoup tree; uses the lxml tree builder when available (selectolax can't build one)."""
+    builder = 'lxml' if lxml is not None and resolve_backend(backend) != 'html.parser' else 'html.parser'
+    return BeautifulSoup(html, builder)
+
+
+class Element:
+    """
+    The slice of bs4's Tag API the rule engine uses: name, attrs (class as a
+    list), get(), [] and string.
+    """
+
+    __slots__ = ('name', 'attrs', '_text')
+
+    def __init__(self, name: str, attrs: dict, text):
+        if 'class' in attrs:
+            attrs['class'] = attrs['class'].split()
+        self.name = name
+        self.attrs = attrs
+        self._text = text
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    @property
+    def string(self) -> Optional[str]:
+        return self._text()
+
+
+def _selectolax_elements(html: str) -> Iterator[Element]:
+    tree = LexborHTMLParser(html)
+    for node in tree.root.traverse(include_text=False):
+        tag = node.tag
+        if tag.startswith(('-', '_')):  # -comment, -text, -document
+            continue
+        attrs = {k: ('' if v is None else v) for k, v in node.attributes.items()}
+        yield Element(tag, attrs, lambda node=node: node.text(deep=True))
+
+
+def _lxml_elements(html: str) -> Iterator[Element]:
+    try:
+        root = lxml.html.document_fromstring(html)
+    except Exception:  # lxml rejects empty documents and str input with an encoding declaration
+        yield from _soup_elements(html)
+        return
+    for node in root.iter():
+        if not isinstance(node.tag, str):  # Comments, processing instructions
+            continue
+        yield Element(node.tag, dict(node.attrib), lambda node=node: node.text)
+
+
+def _soup_elements(html: str) -> Iterator:
+    for elem in BeautifulSoup(html, 'html.parser').descendants:
+        if elem.name is not None:
+            yield elem
+
+
+def parse_elements(html: str, backend: Optional[str] = None) -> Iterator:
+    """Every element of the document in document order, from the chosen backend."""
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return _selectolax_elements(html)
+    if backend == 'lxml':
+        return _lxml_elements(html)
+    return _soup_elements(html)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark
+Pages/sec for each HTML parser backend on a corpus of saved pages.
+
+  walk   parse_elements(): parse and visit every element (rule engine input)
+  audit  walk + the CSSAuditor rules, i.e. the crawler's per-page CPU work
+  soup   make_soup(): BeautifulSoup tree used by the a11y/brand auditors
+
+Save real pages first so runs are comparable:
+  python scripts/parser_benchmark.py ./corpus --save https://site.com https://site.com/blog/
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir))
+
+from css_auditor import CSSAuditor
+from fetch_cache import FetchCache
+from page_parser import BACKENDS, available_backends, make_soup, parse_elements
+
+
+def save_pages(corpus: Path, urls):
+    """Download URLs into the corpus directory as .html files."""
+    corpus.mkdir(parents=True, exist_ok=True)
+    fetcher = FetchCache(None)
+    for url in urls:
+        try:
+            response = fetcher.get(url)
+        except Exception as e:
+            print(f"  ❌ {url}: {e}")
+            continue
+        name = re.sub(r'[^A-Za-z0-9]+', '-', url.split('://', 1)[-1]).strip('-')[:100]
+        (corpus / f"{name}.html").write_text(response.text, encoding='utf-8')
+        print(f"  Saved: {url} ({len(response.text) / 1024:.0f} KB)")
+
+
+def load_corpus(corpus: Path):
+    pages = []
+    for path in sorted(corpus.glob('**/*.htm*')):
+        pages.append((path.name, path.read_text(encoding='utf-8', errors='replace')))
+    return pages
+
+
+def _rate(pages, repeat, work):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            work(html)
+    elapsed = time.perf_counter() - start
+    return len(pages) * repeat / elapsed if elapsed else float('inf')
+
+
+def bench_backend(backend, pages, repeat):
+    auditor = CSSAuditor('http://corpus.local', parser=backend)
+    issues = 0
+
+    def walk(html):
+        for _ in parse_elements(html, backend):
+            pass
+
+    def audit(html):
+        nonlocal issues
+        issues += len(auditor.rules.run(parse_elements(html, backend), 'http://corpus.local/'))
+
+    result = {
+        'backend': backend,
+        'walk': _rate(pages, repeat, walk),
+        'audit': _rate(pages, repeat, audit),
+        'issues_per_page': issues / (len(pages) * repeat),
+        'soup': None
+    }
+    if backend != 'selectolax':  # make_soup can't use selectolax
+        result['soup'] = _rate(pages, repeat, lambda html: make_soup(html, backend))
+    return result
+
+
+def print_results(results, pages):
+    size = sum(len(html) for _, html in pages) / len(pages) / 1024
+    print(f"\nCorpus: {len(pages)} pages, avg {size:.0f} KB")
+    print(f"{'backend':<12} {'walk p/s':>10} {'audit p/s':>10} {'soup p/s':>10} {'issues/page':>12}")
+    baseline = next((r for r in results if r['backend'] == 'html.parser'), None)
+    for r in results:
+        soup = f"{r['soup']:.1f}" if r['soup'] is not None else '-'
+        speedup = ''
+        if baseline and r is not baseline:
+            speedup = f"  ({r['audit'] / baseline['audit']:.1f}x audit)"
+        print(f"{r['backend']:<12} {r['walk']:>10.1f} {r['audit']:>10.1f} {soup:>10} "
+              f"{r['issues_per_page']:>12.1f}{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML parser backend benchmark')
+    parser.add_argument('corpus', help='Directory of saved .html pages')
+    parser.add_argument('--save', nargs='+', metavar='URL',
+                        help='Download these pages into the corpus first')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS,
+                        help='Backends to measure (default: all installed)')
+    parser.add_argument('--repeat', '-r', type=int, default=3,
+                        help='Passes over the corpus per measurement')
+    parser.add_argument('--output', '-o', help='Write results JSON here')
+
+    args = parser.parse_args()
+    corpus = Path(args.corpus)
+
+    if args.save:
+        save_pages(corpus, args.save)
+
+    pages = load_corpus(corpus)
+    if not pages:
+        print(f"❌ No .html pages in {corpus}")
+        return 1
+
+    installed = available_backends()
+    backends = args.backends or installed
+    missing = [b for b in backends if b not in installed]
+    if missing:
+        print(f"Skipping (not installed): {', '.join(missing)}")
+    backends = [b for b in backends if b in installed]
+
+    results = []
+    for backend in backends:
+        print(f"  Measuring {backend}...")
+        results.append(bench_backend(backend, pages, args.repeat))
+
+    print_results(results, pages)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'pages': len(pages), 'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"\n📄 Results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
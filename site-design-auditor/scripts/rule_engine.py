@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Rule Engine
+Single-pass visitor for page audits. Rules declare the tags and attributes
+they care about; one walk over the parsed page hands each element to every
+interested rule, and inline styles are parsed into declarations once per
+element no matter how many rules read them.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+IMPORTANT = re.compile(r'\s*!\s*important\s*$', re.IGNORECASE)
+
+Declaration = Tuple[str, str, bool]  # (property, value, important)
+
+
+def parse_declarations(style: str) -> List[Declaration]:
+    """
+    Split a style attribute into declarations. Semicolons inside quotes or
+    parentheses (e.g. data: URLs) don't end a declaration. Properties are lowercased.
+    """
+    declarations = []
+    for chunk in _split_declarations(style):
+        prop, colon, value = chunk.partition(':')
+        prop = prop.strip().lower()
+        if not colon or not prop:
+            continue
+        if '!' in value:
+            value, important = IMPORTANT.subn('', value)
+            declarations.append((prop, value.strip(), bool(important)))
+        else:
+            declarations.append((prop, value.strip(), False))
+    return declarations
+
+
+def _split_declarations(style: str) -> List[str]:
+    if '(' not in style and '"' not in style and "'" not in style:
+        return style.split(';')  # Common case, no character scan needed
+    chunks = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, ch in enumerate(style):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth = max(0, depth - 1)
+        elif ch == ';' and depth == 0:
+            chunks.append(style[start:i])
+            start = i + 1
+    chunks.append(style[start:])
+    return chunks
+
+
+def selector_for(elem) -> str:
+    """Generate a CSS-like selector for an element."""
+    selector = elem.name
+    if elem.get('id'):
+        selector += f"#{elem['id']}"
+    if elem.get('class'):
+        selector += '.' + '.'.join(elem['class'][:2])
+    return selector
+
+
+class Rule:
+    """
+    Base class for audits. Set `tags` and/or `attributes` to the element names
+    and attribute names the rule wants; visit() is called once per matching element.
+    """
+
+    tags: Tuple[str, ...] = ()
+    attributes: Tuple[str, ...] = ()
+
+    def start_page(self, page: 'PageContext'):
+        pass
+
+    def visit(self, elem, page: 'PageContext'):
+        pass
+
+    def end_page(self, page: 'PageContext'):
+        pass
+
+
+class PageContext:
+    """Per-page state shared by all rules during one walk."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.findings: Dict[Rule, List[dict]] = defaultdict(list)
+        self._elem = None
+        self._declarations: List[Declaration] = []
+        self._selector_elem = None
+        self._selector = ''
+
+    def declarations(self, elem) -> List[Declaration]:
+        """Parsed inline style of the element being visited (parsed once, shared by rules)."""
+        if elem is not self._elem:
+            self._elem = elem
+            self._declarations = parse_declarations(elem.get('style') or '')
+        return self._declarations
+
+    def report(self, rule: Rule, issue: dict):
+        self.findings[rule].append(issue)
+
+    def selector(self, elem) -> str:
+        if elem is not self._selector_elem:
+            self._selector_elem = elem
+            self._selector = selector_for(elem)
+        return self._selector
+
+
+class RuleEngine:
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        self.by_tag: Dict[str, List[Rule]] = defaultdict(list)
+        self.by_attribute: Dict[str, List[Rule]] = defaultdict(list)
+        for rule in self.rules:
+            for tag in rule.tags:
+                self.by_tag[tag].append(rule)
+            for attribute in rule.attributes:
+                self.by_attribute[attribute].append(rule)
+
+    def _plan(self, name: str, attrs) -> List[Rule]:
+        """Rules interested in an element, each once, in registration order."""
+        wanted = set(self.by_tag.get(name, ()))
+        for attribute, rules in self.by_attribute.items():
+            if attribute in attrs:
+                wanted.update(rules)
+        return [rule for rule in self.rules if rule in wanted]
+
+    def run(self, elements: Iterable, url: str) -> List[dict]:
+        """
+        Walk the document's elements once (e.g. page_parser.parse_elements()) and
+        return the issues found, grouped by rule in registration order (the order
+        separate per-rule passes would produce).
+        """
+        page = PageContext(url)
+        for rule in self.rules:
+            rule.start_page(page)
+
+        watched = tuple(self.by_attribute)
+        plans: Dict[tuple, List[Rule]] = {}
+        for elem in elements:
+            name = elem.name
+            attrs = elem.attrs
+            key = (name, *(attribute in attrs for attribute in watched))
+            interested = plans.get(key)
+            if interested is None:
+                interested = plans[key] = self._plan(name, attrs)
+            for rule in interested:
+                rule.visit(elem, page)
+
+        for rule in self.rules:
+            rule.end_page(page)
+        return [issue for rule in self.rules for issue in page.findings.get(rule, ())]
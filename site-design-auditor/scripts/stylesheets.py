@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Stylesheets
+Parses CSS into (selector, declarations) rules with tinycss2 and caches the
+result by content hash, in memory for the crawl and on disk across runs, so
+a theme stylesheet linked from every page is parsed once.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tinycss2
+except ImportError:
+    print("Installing dependencies...")
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install",
+                          "tinycss2", "--break-system-packages", "-q"])
+    import tinycss2
+
+
+FORMAT_VERSION = 1  # Bump when ParsedStylesheet changes so old disk entries are ignored
+
+# At-rules whose blocks hold ordinary style rules; others (@font-face, @keyframes, @page) are skipped
+GROUPING_AT_RULES = ('media', 'supports', 'layer', 'container', 'scope', 'document')
+
+Declaration = Tuple[str, str, bool]  # (property, value, important), as in rule_engine
+
+
+@dataclass
+class ParsedStylesheet:
+    sha256: str
+    rules: List[Tuple[str, List[Declaration]]] = field(default_factory=list)  # (selector, declarations)
+    imports: List[str] = field(default_factory=list)  # @import targets, unresolved
+
+    def to_dict(self) -> dict:
+        return {'sha256': self.sha256, 'rules': self.rules, 'imports': self.imports}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ParsedStylesheet':
+        rules = [(selector, [tuple(d) for d in declarations]) for selector, declarations in data['rules']]
+        return cls(data['sha256'], rules, data['imports'])
+
+
+def parse_stylesheet(css: str, sha256: str = '') -> ParsedStylesheet:
+    parsed = ParsedStylesheet(sha256 or hashlib.sha256(css.encode()).hexdigest())
+    _collect(tinycss2.parse_stylesheet(css, skip_comments=True, skip_whitespace=True), '', parsed)
+    return parsed
+
+
+def _collect(nodes, context: str, parsed: ParsedStylesheet):
+    for node in nodes:
+        if node.type == 'qualified-rule':
+            selector = tinycss2.serialize(node.prelude).strip()
+            declarations = []
+            for decl in tinycss2.parse_declaration_list(node.content, skip_comments=True,
+                                                        skip_whitespace=True):
+                if decl.type == 'declaration':
+                    declarations.append((decl.lower_name, tinycss2.serialize(decl.value).strip(),
+                                         decl.important))
+            parsed.rules.append((context + selector, declarations))
+        elif node.type == 'at-rule':
+            if node.lower_at_keyword == 'import':
+                target = _import_target(node.prelude)
+                if target:
+                    parsed.imports.append(target)
+            elif node.lower_at_keyword in GROUPING_AT_RULES and node.content is not None:
+                condition = tinycss2.serialize(node.prelude).strip()
+                inner = tinycss2.parse_rule_list(node.content, skip_comments=True, skip_whitespace=True)
+                _collect(inner, f"{context}@{node.lower_at_keyword} {condition} ", parsed)
+
+
+def _import_target(prelude) -> Optional[str]:
+    for token in prelude:
+        if token.type in ('string', 'url'):
+            return token.value
+        if token.type == 'function' and token.lower_name == 'url':
+            for arg in token.arguments:
+                if arg.type == 'string':
+                    return arg.value
+    return None
+
+
+class StylesheetCache:
+    """Parsed stylesheets by content hash: memory first, then cache_dir (if given)."""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir) / f"v{FORMAT_VERSION}" if cache_dir else None
+        self.memory: Dict[str, ParsedStylesheet] = {}
+        self.lock = threading.Lock()
+        self.stats = {'parsed': 0, 'memory_hits': 0, 'disk_hits': 0}
+
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def parse(self, css: str) -> ParsedStylesheet:
+        digest = hashlib.sha256(css.encode()).hexdigest()
+        with self.lock:
+            parsed = self.memory.get(digest)
+            if parsed is not None:
+                self.stats['memory_hits'] += 1
+                return parsed
+
+        parsed = self._load(digest)
+        if parsed is not None:
+            stat = 'disk_hits'
+        else:
+            parsed = parse_stylesheet(css, digest)
+            self._save(parsed)
+            stat = 'parsed'
+        with self.lock:
+            self.memory[digest] = parsed
+            self.stats[stat] += 1
+        return parsed
+
+    def _load(self, digest: str) -> Optional[ParsedStylesheet]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(digest)) as f:
+                return ParsedStylesheet.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save(self, parsed: ParsedStylesheet):
+        if not self.cache_dir:
+            return
+        path = self._path(parsed.sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(parsed.to_dict(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Warning: Could not cache parsed stylesheet: {e}")